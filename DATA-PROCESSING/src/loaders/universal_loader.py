@@ -30,18 +30,27 @@ report = loader.get_load_report()  # See what happened
 """
 
 from typing import Dict, List, Optional, Any, Tuple
+from datetime import datetime
+import numpy as np
 import pandas as pd
 import json
 import logging
 
-from ..schema import HarmonizedRecord, ImageMetadata, create_schema_columns
+from ..schema import (
+    ImageMetadata, ClinicalFindings, DeviceAndAcquisition, PatientClinicalData,
+    CATEGORICAL_COLUMNS, create_schema_columns
+)
 from ..rules import (
-    detect_column_role, harmonize_column_value,
-    normalize_diagnosis, infer_severity_from_diagnosis, infer_laterality
+    detect_column_role, harmonize_column_value, harmonize_column_series,
+    normalize_diagnosis_series, infer_severity_from_diagnosis, infer_laterality,
+    DIAGNOSIS_CATEGORY_DTYPE
 )
 
 logger = logging.getLogger(__name__)
 
+# Fields whose values go through the rules engine before landing in a record
+HARMONIZED_FIELDS = ('modality', 'laterality', 'patient_age', 'patient_sex', 'patient_ethnicity')
+
 
 class LoaderException(Exception):
     """Base exception for loader errors."""
@@ -73,8 +82,8 @@ class UniversalLoader:
     PROCESSING PIPELINE:
     1. Load raw data into pandas DataFrame
     2. Detect column roles (diagnosis, modality, laterality, etc.)
-    3. For each row: harmonize values using rules engine
-    4. Create HarmonizedRecord with standardized data
+    3. For each column: harmonize distinct values using rules engine
+    4. Assemble canonical HarmonizedRecord columns
     5. Collect quality metrics and error reports
 
     QUALITY ASSURANCE:
@@ -94,7 +103,6 @@ class UniversalLoader:
                            Format: {'dataset_column': 'schema_field'}
                            Use when auto-detection fails or for custom datasets
         """
-        """
         self.dataset_name = dataset_name
         self.column_mapping = column_mapping or {}
         self.auto_detected_columns: Dict[str, str] = {}
@@ -135,7 +143,7 @@ class UniversalLoader:
         # Check for critical missing fields
         missing = set(required_fields) - detected_required
         if missing:
-            logger.warning(f"Could not detect required fields: {missing}")
+            logger.warning("Could not detect required fields: %s", missing)
         
         self.auto_detected_columns = detected
         return detected
@@ -144,6 +152,11 @@ class UniversalLoader:
         """
         Load and harmonize a dataset with error handling.
         
+        Every canonical column is built for the whole dataset at once; rules
+        run once per distinct raw value rather than once per row. Errors are
+        therefore isolated per source column, not per row: a column that
+        fails is recorded in load_errors and treated as unmapped.
+        
         Args:
             df: Input dataframe
             
@@ -151,163 +164,252 @@ class UniversalLoader:
             Harmonized dataframe with canonical schema
         """
         if df.empty:
-            logger.warning(f"Dataset {self.dataset_name} is empty")
+            logger.warning("Dataset %s is empty", self.dataset_name)
             return pd.DataFrame(columns=create_schema_columns())
         
-        logger.info(f"Loading dataset: {self.dataset_name} (shape: {df.shape})")
+        logger.info("Loading dataset: %s (shape: %s)", self.dataset_name, df.shape)
         
-        # Auto-detect columns if not explicitly mapped
+        # Auto-detect columns if not explicitly mapped; an explicit mapping
+        # skips detection entirely but is still reported as the column mapping
         if not self.column_mapping:
             self.auto_detect_columns(df)
             mapping = self.auto_detected_columns
         else:
             mapping = self.column_mapping
+            self.auto_detected_columns = mapping
         
-        logger.info(f"Using column mapping: {mapping}")
+        logger.info("Using column mapping: %s", mapping)
         
-        # Convert rows to harmonized records
-        harmonized_records = []
         self.load_errors = []
         self.warnings = []
         
-        for idx, row in df.iterrows():
-            try:
-                record = self._harmonize_row(row, mapping, idx)
-                if record:
-                    harmonized_records.append(record.to_dict())
-            except Exception as e:
-                error_msg = f"Error harmonizing row {idx}: {str(e)}"
-                logger.error(error_msg)
-                self.load_errors.append({
-                    'row_index': idx,
-                    'error': str(e),
-                    'data': row.to_dict()
-                })
-        
-        # Create harmonized dataframe
-        if not harmonized_records:
-            logger.warning(f"No records could be harmonized from {self.dataset_name}")
-            return pd.DataFrame(columns=create_schema_columns())
+        # Harmonize rule-driven fields column-wise, once per distinct value
+        # Unmapped fields still go through the rules (e.g. modality from dataset name)
+        context = {'dataset_name': self.dataset_name}
+        harmonized = {}
+        for field in HARMONIZED_FIELDS:
+            col = mapping.get(field)
+            values = None
+            if col in df.columns:
+                values = self._capture_column_errors(
+                    field, col, lambda: harmonize_column_series(field, df[col], context).to_numpy()
+                )
+            if values is None:
+                values = np.full(len(df), harmonize_column_value(field, None, context), dtype=object)
+            harmonized[field] = values
         
-        result_df = pd.DataFrame(harmonized_records)
+        # Raw values as strings (None when missing), like the rules engine expects
+        image_ids = self._get_column(df, mapping, 'image_id')
+        diagnosis_raw = self._get_column(df, mapping, 'diagnosis')
+        severity_raw = self._get_column(df, mapping, 'severity')
         
-        # Ensure all canonical columns are present
-        for col in create_schema_columns():
-            if col not in result_df.columns:
-                result_df[col] = None
+        # Fall back to a synthetic image_id where the source has none
+        missing_id = ~image_ids.astype(bool)
+        if missing_id.any():
+            image_ids[missing_id] = [f"{self.dataset_name}_{idx}" for idx in df.index[missing_id]]
         
-        result_df = result_df[create_schema_columns()]
+        # Normalize the diagnosis column in one pass; explicit severity wins over inferred
+        diagnosis_col = mapping.get('diagnosis')
+        normalized = None
+        if diagnosis_col in df.columns:
+            normalized = self._capture_column_errors(
+                'diagnosis', diagnosis_col, lambda: normalize_diagnosis_series(df[diagnosis_col])
+            )
+        if normalized is not None:
+            diag_cat, sev_inf = normalized
+            diagnosis_category = diag_cat.array
+            severity = np.where(severity_raw.astype(bool), severity_raw, sev_inf.to_numpy())
+        else:
+            diagnosis_category = pd.Categorical.from_codes(np.full(len(df), -1), dtype=DIAGNOSIS_CATEGORY_DTYPE)
+            severity = severity_raw
+        
+        # Nested objects are serialized once per distinct combination of values
+        findings_template = ClinicalFindings().to_dict()
+        clinical_findings = self._serialize_distinct(
+            self._get_column(df, mapping, 'clinical_notes'),
+            lambda notes: {**findings_template, 'findings_notes': notes},
+        )
+        
+        patient_template = PatientClinicalData().to_dict()
+        patient_clinical = self._serialize_distinct(
+            zip(harmonized['patient_age'], harmonized['patient_sex'], harmonized['patient_ethnicity']),
+            lambda key: {**patient_template, 'age': key[0], 'sex': key[1], 'ethnicity': key[2]},
+        )
+        
+        metadata_template = ImageMetadata().to_dict()
+        resolutions = zip(
+            self._get_int_column(df, mapping, 'resolution_x'),
+            self._get_int_column(df, mapping, 'resolution_y'),
+        )
+        image_metadata = self._serialize_distinct(
+            resolutions,
+            lambda key: self._resolution_metadata(metadata_template, *key),
+        )
+        
+        # Store unmapped columns in extra_json
+        mapped_columns = set(mapping.values())
+        unmapped_cols = [col for col in df.columns if col not in mapped_columns and col is not None]
+        extra_json = self._extra_json_column(df, unmapped_cols) if unmapped_cols else None
+        
+        # Validate all records in one pass (mirrors HarmonizedRecord.validate)
+        quality_flags, is_valid, validation_notes = self._validate_columns(harmonized['patient_age'])
+        for pos in np.flatnonzero(~is_valid):
+            self.warnings.append({
+                'row_index': df.index[pos],
+                'image_id': image_ids[pos],
+                'message': validation_notes[pos],
+            })
+        
+        result_df = pd.DataFrame({
+            'image_id': image_ids,
+            'dataset_source': self.dataset_name,
+            'patient_id': self._get_column(df, mapping, 'patient_id'),
+            'visit_number': None,
+            'modality': harmonized['modality'],
+            'laterality': harmonized['laterality'],
+            'view_type': self._get_column(df, mapping, 'view_type'),
+            'image_path': self._get_column(df, mapping, 'image_path'),
+            'diagnosis_raw': diagnosis_raw,
+            'diagnosis_category': diagnosis_category,
+            'diagnosis_confidence': None,
+            'multiple_diagnoses': json.dumps([]),
+            'severity': severity,
+            'clinical_findings': clinical_findings,
+            'disease_specific_fields': json.dumps({}),
+            'patient_clinical': patient_clinical,
+            'device_and_acquisition': json.dumps(DeviceAndAcquisition().to_dict()),
+            'image_metadata': image_metadata,
+            'exam_date': None,
+            'exam_time': None,
+            'facility_name': None,
+            'follow_up_recommended': None,
+            'quality_flags': quality_flags,
+            'is_valid': is_valid,
+            'validation_notes': validation_notes,
+            'annotation_quality': None,
+            'data_source_reliability': None,
+            'internal_consistency_check': None,
+            'extra_json': extra_json,
+            'created_at': datetime.utcnow().isoformat(),
+        }, columns=create_schema_columns())
+        result_df = result_df.astype({col: 'category' for col in CATEGORICAL_COLUMNS})
         
         logger.info(
-            f"Successfully harmonized {len(result_df)} records from {self.dataset_name} "
-            f"({len(self.load_errors)} errors)"
+            "Successfully harmonized %d records from %s (%d errors)",
+            len(result_df), self.dataset_name, len(self.load_errors)
         )
         
         return result_df
     
-    def _harmonize_row(self, row: pd.Series, mapping: Dict[str, str], row_index: int) -> Optional[HarmonizedRecord]:
-        """
-        Convert a single row to a harmonized record with validation.
+    def _get_column(self, df: pd.DataFrame, mapping: Dict[str, str], field: str) -> np.ndarray:
+        """Get raw values for a schema field as strings, None where missing or unmapped."""
+        col = mapping.get(field)
+        if col in df.columns:
+            values = self._capture_column_errors(field, col, lambda: self._encode_distinct(df[col], str, None))
+            if values is not None:
+                return values
+        return np.full(len(df), None, dtype=object)
+    
+    def _get_int_column(self, df: pd.DataFrame, mapping: Dict[str, str], field: str) -> np.ndarray:
+        """Parse a schema field as integers (floats truncated), None where missing or unparseable."""
+        raw = pd.Series(self._get_column(df, mapping, field), dtype=object)
+        numeric = pd.to_numeric(raw, errors='coerce').astype(float)
         
-        Args:
-            row: Input row (pandas Series)
-            mapping: Column mapping
-            row_index: Row index for error tracking
-            
-        Returns:
-            HarmonizedRecord or None if validation fails
-        """
+        # inf and values beyond int64 cannot be resolutions
+        numeric = numeric.where(np.isfinite(numeric) & (numeric.abs() < 2**63))
+        return np.trunc(numeric).astype('Int64').to_numpy(dtype=object, na_value=None)
+    
+    def _encode_distinct(self, series: pd.Series, encode, missing: Any) -> np.ndarray:
+        """Apply encode() once per distinct value of series, with `missing` for NA."""
         try:
-            # Get image_id - fallback to row index if not found
-            image_id = self._get_value(row, mapping, 'image_id')
-            if not image_id:
-                image_id = f"{self.dataset_name}_{row_index}"
-            
-            # Get diagnosis and severity
-            diagnosis_raw = self._get_value(row, mapping, 'diagnosis')
-            diagnosis_category, severity_inferred = normalize_diagnosis(diagnosis_raw)
-            severity = self._get_value(row, mapping, 'severity') or severity_inferred
-            
-            # Get diagnosis confidence (placeholder for future enhancement)
-            diagnosis_confidence = None
-            
-            # Create record
-            record = HarmonizedRecord(
-                image_id=image_id,
-                dataset_source=self.dataset_name,
-                modality=self._get_harmonized_value(row, mapping, 'modality'),
-                laterality=self._get_harmonized_value(row, mapping, 'laterality'),
-                view_type=self._get_value(row, mapping, 'view_type'),
-                image_path=self._get_value(row, mapping, 'image_path'),
-                diagnosis_raw=diagnosis_raw,
-                diagnosis_category=diagnosis_category,
-                diagnosis_confidence=diagnosis_confidence,
-                severity=severity,
-                clinical_notes=self._get_value(row, mapping, 'clinical_notes'),
-                patient_id=self._get_value(row, mapping, 'patient_id'),
-                patient_age=self._get_harmonized_value(row, mapping, 'patient_age'),
-                patient_sex=self._get_harmonized_value(row, mapping, 'patient_sex'),
-                patient_ethnicity=self._get_harmonized_value(row, mapping, 'patient_ethnicity'),
+            codes, uniques = pd.factorize(series)
+        except TypeError:
+            # Unhashable cells (dicts or lists, e.g. from read_json or
+            # json_normalize) cannot be factorized; encode them one at a time
+            isna = series.isna().to_numpy()
+            return np.array(
+                [missing if na else encode(val) for val, na in zip(series, isna)], dtype=object
             )
-            
-            # Extract image metadata
-            resolution_x = self._try_parse_int(self._get_value(row, mapping, 'resolution_x'))
-            resolution_y = self._try_parse_int(self._get_value(row, mapping, 'resolution_y'))
-            
-            if resolution_x or resolution_y:
-                record.image_metadata = ImageMetadata(
-                    resolution_x=resolution_x,
-                    resolution_y=resolution_y,
-                )
-            
-            # Store unmapped columns in extra_json
-            mapped_columns = set(mapping.values())
-            unmapped = {}
-            for col in row.index:
-                if col not in mapped_columns and col is not None:
-                    val = row[col]
-                    if pd.notna(val):
-                        unmapped[col] = str(val)
-            
-            if unmapped:
-                record.extra_json = unmapped
-            
-            # Validate record
-            if not record.validate():
-                self.warnings.append({
-                    'row_index': row_index,
-                    'image_id': image_id,
-                    'message': record.validation_notes
-                })
-            
-            return record
+        encoded = np.empty(len(uniques) + 1, dtype=object)
+        encoded[:-1] = [encode(u) for u in uniques]
+        encoded[-1] = missing
+        return encoded[codes]
+    
+    def _extra_json_column(self, df: pd.DataFrame, unmapped_cols: List[str]) -> np.ndarray:
+        """
+        JSON-encode unmapped columns per row, skipping missing values.
+        
+        Each column contributes a '"col": "value"' fragment (encoded once per
+        distinct value); fragments are joined across columns with elementwise
+        string concatenation, which yields exactly json.dumps() of the dict.
+        """
+        joined = np.full(len(df), '', dtype=object)
+        for col in unmapped_cols:
+            fragments = self._capture_column_errors('extra_json', col, lambda: self._encode_distinct(
+                df[col], lambda val: json.dumps({col: str(val)})[1:-1], ''
+            ))
+            if fragments is None:
+                continue
+            separator = np.where((joined != '') & (fragments != ''), ', ', '')
+            joined = joined + separator + fragments
         
+        return np.where(joined != '', '{' + joined + '}', None)
+    
+    def _capture_column_errors(self, field: str, col: str, build) -> Optional[Any]:
+        """Return build(), or record the error in load_errors and return None if it raises."""
+        try:
+            return build()
         except Exception as e:
-            logger.error(f"Error harmonizing row {row_index}: {str(e)}")
-            raise
+            logger.error("Error harmonizing column %s of %s: %s", col, self.dataset_name, e)
+            self.load_errors.append({'field': field, 'column': col, 'error': str(e)})
+            return None
     
-    def _get_value(self, row: pd.Series, mapping: Dict[str, str], field: str) -> Optional[str]:
-        """Get raw value from row."""
-        col = mapping.get(field)
-        if col and col in row.index:
-            val = row[col]
-            return str(val) if pd.notna(val) else None
-        return None
+    def _serialize_distinct(self, keys, build) -> np.ndarray:
+        """JSON-encode build(key) for each key, computing each distinct key once."""
+        cache = {}
+        out = []
+        for key in keys:
+            encoded = cache.get(key)
+            if encoded is None:
+                encoded = cache[key] = json.dumps(build(key))
+            out.append(encoded)
+        return np.array(out, dtype=object)
     
-    def _get_harmonized_value(self, row: pd.Series, mapping: Dict[str, str], field: str) -> Any:
-        """Get harmonized value from row."""
-        raw_value = self._get_value(row, mapping, field)
-        context = {'dataset_name': self.dataset_name}
-        return harmonize_column_value(field, raw_value, context)
+    def _resolution_metadata(
+        self,
+        template: Dict[str, Any],
+        resolution_x: Optional[int],
+        resolution_y: Optional[int]
+    ) -> Dict[str, Any]:
+        """Image metadata dict with resolution filled in when either axis is set."""
+        if resolution_x or resolution_y:
+            return {**template, 'resolution_x': resolution_x, 'resolution_y': resolution_y}
+        return template
     
-    def _try_parse_int(self, value: Optional[str]) -> Optional[int]:
-        """Safely parse integer value."""
-        if not value:
-            return None
-        try:
-            return int(float(value))
-        except (ValueError, TypeError):
-            return None
+    def _validate_columns(self, ages: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Column-wise equivalent of HarmonizedRecord.validate() for loader output.
+        
+        image_id always has a fallback and the loader never sets confidence,
+        cup-to-disc, BMI or IOP, so only dataset_source and age can fail.
+        
+        Returns:
+            (quality_flags JSON, is_valid, validation_notes) arrays
+        """
+        age_values = pd.to_numeric(pd.Series(ages, dtype=object), errors='coerce')
+        bad_age = (age_values.notna() & ~age_values.between(0, 150)).to_numpy()
+        
+        quality_flags = np.where(bad_age, json.dumps(["age_out_of_reasonable_range"]), json.dumps([]))
+        
+        notes = np.full(len(ages), None, dtype=object)
+        notes[bad_age] = [f"Invalid age: {age}" for age in ages[bad_age]]
+        
+        if not self.dataset_name:
+            missing = "Missing required fields: image_id or dataset_source"
+            notes = np.array([missing if n is None else f"{missing}; {n}" for n in notes], dtype=object)
+            return quality_flags.astype(object), np.zeros(len(ages), dtype=bool), notes
+        
+        return quality_flags.astype(object), ~bad_age, notes
     
     def get_load_report(self) -> Dict[str, Any]:
         """
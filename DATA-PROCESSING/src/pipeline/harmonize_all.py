@@ -36,19 +36,107 @@ pipeline.export_results()
 ```
 """
 
-from typing import Dict, List, Optional, Callable
+from typing import Any, Dict, List, Optional, Callable, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 import logging
 
 from ..loaders import UniversalLoader
-from ..schema import create_schema_columns
+from ..schema import CATEGORICAL_COLUMNS, create_schema_columns
 
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Parquet write settings: ~64k-row groups keep column chunks cache-sized,
+# zstd level 3 roughly halves output vs snappy at similar CPU cost
+PARQUET_ROW_GROUP_SIZE = 65536
+PARQUET_COMPRESSION = 'zstd'
+PARQUET_COMPRESSION_LEVEL = 3
+
+# Canonical columns that are not plain strings; everything else is stored as string
+_NON_STRING_COLUMNS = {
+    **{col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLUMNS},
+    'visit_number': pa.int64(),
+    'diagnosis_confidence': pa.float64(),
+    'follow_up_recommended': pa.bool_(),
+    'is_valid': pa.bool_(),
+    'internal_consistency_check': pa.bool_(),
+}
+
+
+def harmonized_arrow_schema() -> pa.Schema:
+    """
+    Arrow schema for harmonized records.
+    
+    Pinned up front so every dataset written to the same Parquet file agrees
+    on column types, even when a column happens to be all-null in one of them.
+    Both export_to_parquet() and stream_to_parquet() write this schema, so
+    their files can be read together. Categorical columns are dictionary
+    encoded, matching their in-memory dtype.
+    """
+    return pa.schema([
+        (col, _NON_STRING_COLUMNS.get(col, pa.string()))
+        for col in create_schema_columns()
+    ])
+
+
+def _empty_harmonized_frame() -> pd.DataFrame:
+    """Canonical columns with no rows, with the same categorical dtypes as harmonized output."""
+    return pd.DataFrame(columns=create_schema_columns()).astype({col: 'category' for col in CATEGORICAL_COLUMNS})
+
+
+def _harmonize_one(dataset_name: str, config: Dict) -> Tuple[str, Optional[pd.DataFrame], Optional[Dict[str, Any]]]:
+    """
+    Load and harmonize one registered dataset.
+    
+    Module-level so it can run in a worker process; datasets share no state,
+    so each call is independent.
+    
+    Args:
+        dataset_name: Name of the dataset
+        config: Registry entry with 'loader_fn' and 'column_mapping'
+        
+    Returns:
+        (dataset_name, harmonized dataframe, load report); dataframe and report
+        are None if loading or harmonization failed
+    """
+    try:
+        # Load the raw dataset
+        logger.info("Loading dataset: %s", dataset_name)
+        raw_df = config['loader_fn']()
+        
+        # Harmonize using UniversalLoader
+        logger.info("Harmonizing dataset: %s", dataset_name)
+        loader = UniversalLoader(dataset_name, config['column_mapping'])
+        harmonized_df = loader.load_and_harmonize(raw_df)
+        
+        return dataset_name, harmonized_df, loader.get_load_report()
+    
+    except Exception as e:
+        logger.error("Error harmonizing %s: %s", dataset_name, e)
+        return dataset_name, None, None
+
+
+def _harmonize_one_arrow(dataset_name: str, config: Dict) -> Tuple[str, Optional[bytes], Optional[Dict[str, Any]]]:
+    """
+    Worker-process wrapper around _harmonize_one().
+    
+    WHY: Pickling a dataframe full of Python strings back to the parent is
+    slow. An Arrow IPC stream is a few contiguous buffers that the parent
+    rebuilds columns from directly.
+    
+    Returns:
+        (dataset_name, Arrow IPC bytes of the harmonized dataframe, load report)
+    """
+    dataset_name, harmonized_df, report = _harmonize_one(dataset_name, config)
+    if harmonized_df is None:
+        return dataset_name, None, report
+    return dataset_name, pa.ipc.serialize_pandas(harmonized_df, preserve_index=False).to_pybytes(), report
+
 
 class HarmonizationPipeline:
     """
@@ -95,6 +183,7 @@ class HarmonizationPipeline:
         # INTERNAL STATE TRACKING
         self.datasets_registry: Dict[str, Dict] = {}  # Registered datasets
         self.harmonized_dfs: Dict[str, pd.DataFrame] = {}  # Processed results
+        self.load_reports: Dict[str, Dict] = {}  # UniversalLoader reports per dataset
         self.merged_df: Optional[pd.DataFrame] = None  # Final merged result
     
     def register_dataset(
@@ -118,7 +207,7 @@ class HarmonizationPipeline:
             'column_mapping': column_mapping or {},
             'enabled': enabled,
         }
-        logger.info(f"Registered dataset: {dataset_name}")
+        logger.info("Registered dataset: %s", dataset_name)
     
     def harmonize_dataset(self, dataset_name: str) -> Optional[pd.DataFrame]:
         """
@@ -131,43 +220,63 @@ class HarmonizationPipeline:
             Harmonized dataframe or None if not found
         """
         if dataset_name not in self.datasets_registry:
-            logger.warning(f"Dataset not found: {dataset_name}")
+            logger.warning("Dataset not found: %s", dataset_name)
             return None
         
-        config = self.datasets_registry[dataset_name]
-        
-        try:
-            # Load the raw dataset
-            logger.info(f"Loading dataset: {dataset_name}")
-            raw_df = config['loader_fn']()
-            
-            # Harmonize using UniversalLoader
-            logger.info(f"Harmonizing dataset: {dataset_name}")
-            loader = UniversalLoader(dataset_name, config['column_mapping'])
-            harmonized_df = loader.load_and_harmonize(raw_df)
-            
-            self.harmonized_dfs[dataset_name] = harmonized_df
-            logger.info(f"Successfully harmonized {dataset_name}: {len(harmonized_df)} records")
-            
-            return harmonized_df
-        
-        except Exception as e:
-            logger.error(f"Error harmonizing {dataset_name}: {str(e)}")
-            return None
+        _, harmonized_df, report = _harmonize_one(dataset_name, self.datasets_registry[dataset_name])
+        return self._store_result(dataset_name, harmonized_df, report)
     
-    def harmonize_all(self) -> pd.DataFrame:
+    def harmonize_all(self, max_workers: int = 1) -> pd.DataFrame:
         """
         Load and harmonize all enabled datasets.
         
+        Datasets are independent, so they can be processed in parallel worker
+        processes. Parallel runs require picklable loader functions (defined
+        at module level, not lambdas or closures).
+        
+        Args:
+            max_workers: Number of worker processes (default: 1, sequential).
+                        None uses one process per dataset, up to the CPU count.
+        
         Returns:
             Merged dataframe containing all harmonized datasets
         """
-        for dataset_name, config in self.datasets_registry.items():
-            if config['enabled']:
+        enabled = [
+            (dataset_name, config)
+            for dataset_name, config in self.datasets_registry.items()
+            if config['enabled']
+        ]
+        
+        if max_workers is None:
+            max_workers = min(len(enabled), os.cpu_count() or 1)
+        
+        if max_workers > 1 and len(enabled) > 1:
+            names, configs = zip(*enabled)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                for dataset_name, payload, report in executor.map(_harmonize_one_arrow, names, configs):
+                    harmonized_df = None if payload is None else pa.ipc.deserialize_pandas(payload)
+                    self._store_result(dataset_name, harmonized_df, report)
+        else:
+            for dataset_name, _ in enabled:
                 self.harmonize_dataset(dataset_name)
         
         return self.merge_all()
     
+    def _store_result(
+        self,
+        dataset_name: str,
+        harmonized_df: Optional[pd.DataFrame],
+        report: Optional[Dict[str, Any]]
+    ) -> Optional[pd.DataFrame]:
+        """Record a dataset's harmonized output and load report."""
+        if harmonized_df is None:
+            return None
+        
+        self.harmonized_dfs[dataset_name] = harmonized_df
+        self.load_reports[dataset_name] = report
+        logger.info("Successfully harmonized %s: %d records", dataset_name, len(harmonized_df))
+        return harmonized_df
+    
     def merge_all(self) -> pd.DataFrame:
         """
         Merge all harmonized datasets into a single dataframe.
@@ -177,25 +286,140 @@ class HarmonizationPipeline:
         """
         if not self.harmonized_dfs:
             logger.warning("No harmonized datasets to merge")
-            return pd.DataFrame(columns=create_schema_columns())
+            return _empty_harmonized_frame()
         
-        logger.info(f"Merging {len(self.harmonized_dfs)} datasets")
+        logger.info("Merging %d datasets", len(self.harmonized_dfs))
         
-        # Concatenate all harmonized dataframes
-        self.merged_df = pd.concat(
-            list(self.harmonized_dfs.values()),
-            ignore_index=True
-        )
+        # Every frame already has the canonical columns in order, so concat
+        # copies each column exactly once. Empty frames are skipped (they would
+        # only upcast dtypes), and a single dataset is reused without copying.
+        frames = [df for df in self.harmonized_dfs.values() if not df.empty]
+        if not frames:
+            self.merged_df = _empty_harmonized_frame()
+        elif len(frames) == 1:
+            self.merged_df = frames[0].reset_index(drop=True)
+        else:
+            frames = self._unify_categories(frames)
+            self.merged_df = pd.concat(frames, ignore_index=True, sort=False)
         
-        logger.info(f"Merged dataset has {len(self.merged_df)} total records")
+        logger.info("Merged dataset has %d total records", len(self.merged_df))
         return self.merged_df
     
-    def export_to_parquet(self, filename: str = 'harmonized.parquet') -> Path:
+    def stream_to_parquet(self, filename: str = 'harmonized.parquet') -> Optional[Path]:
+        """
+        Harmonize enabled datasets one at a time, appending each to a Parquet file.
+        
+        Unlike harmonize_all() + export_to_parquet(), no merged dataframe is
+        built: each dataset is written as soon as it is harmonized and then
+        released, so peak memory is one dataset rather than all of them.
+        harmonized_dfs and merged_df are left untouched.
+        
+        Args:
+            filename: Output filename (default: 'harmonized.parquet')
+            
+        Returns:
+            Path to output file, or None if writing failed
+        """
+        output_path = self.output_dir / filename
+        schema = harmonized_arrow_schema()
+        total_records = 0
+        
+        try:
+            with pq.ParquetWriter(
+                output_path,
+                schema,
+                compression=PARQUET_COMPRESSION,
+                compression_level=PARQUET_COMPRESSION_LEVEL,
+                use_dictionary=True,
+            ) as writer:
+                for dataset_name, harmonized_df in self._iter_harmonized():
+                    table = pa.Table.from_pandas(harmonized_df, schema=schema, preserve_index=False)
+                    writer.write_table(table, row_group_size=PARQUET_ROW_GROUP_SIZE)
+                    total_records += len(harmonized_df)
+                    logger.info("Streamed %s: %d records", dataset_name, len(harmonized_df))
+            
+            logger.info("Exported %d harmonized records to %s", total_records, output_path)
+            return output_path
+        except Exception as e:
+            logger.error("Error streaming to parquet: %s", e)
+            return None
+    
+    def stream_to_csv(self, filename: str = 'harmonized.csv') -> Optional[Path]:
+        """
+        Harmonize enabled datasets one at a time, appending each to a CSV file.
+        
+        CSV counterpart of stream_to_parquet(): the header is written once and
+        each dataset's rows are appended as soon as it is harmonized, so no
+        merged dataframe is built.
+        
+        Args:
+            filename: Output filename (default: 'harmonized.csv')
+            
+        Returns:
+            Path to output file, or None if writing failed
+        """
+        output_path = self.output_dir / filename
+        total_records = 0
+        
+        try:
+            with open(output_path, 'w', newline='', encoding='utf-8') as f:
+                pd.DataFrame(columns=create_schema_columns()).to_csv(f, index=False)
+                for dataset_name, harmonized_df in self._iter_harmonized():
+                    harmonized_df.to_csv(f, index=False, header=False)
+                    total_records += len(harmonized_df)
+                    logger.info("Streamed %s: %d records", dataset_name, len(harmonized_df))
+            
+            logger.info("Exported %d harmonized records to %s", total_records, output_path)
+            return output_path
+        except Exception as e:
+            logger.error("Error streaming to CSV: %s", e)
+            return None
+    
+    def _iter_harmonized(self):
+        """
+        Harmonize enabled datasets one at a time, for the streaming exports.
+        
+        Yields (dataset_name, harmonized dataframe) for each dataset that
+        produced rows, recording its load report; failed and empty datasets
+        are skipped. Nothing is kept in harmonized_dfs.
+        """
+        for dataset_name, config in self.datasets_registry.items():
+            if not config['enabled']:
+                continue
+            
+            _, harmonized_df, report = _harmonize_one(dataset_name, config)
+            if harmonized_df is None or harmonized_df.empty:
+                continue
+            
+            self.load_reports[dataset_name] = report
+            yield dataset_name, harmonized_df
+    
+    def _unify_categories(self, frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+        """
+        Give categorical columns the same categories in every frame.
+        
+        pd.concat only keeps the category dtype when categories match exactly;
+        otherwise it falls back to object strings for the whole merged column.
+        """
+        dtypes = {}
+        for col in CATEGORICAL_COLUMNS:
+            if all(isinstance(df[col].dtype, pd.CategoricalDtype) for df in frames):
+                categories = frames[0][col].cat.categories
+                for df in frames[1:]:
+                    categories = categories.union(df[col].cat.categories)
+                dtypes[col] = pd.CategoricalDtype(categories)
+        
+        return [df.astype(dtypes) for df in frames] if dtypes else frames
+    
+    def export_to_parquet(self, filename: str = 'harmonized.parquet', columns: Optional[List[str]] = None) -> Path:
         """
         Export merged dataframe to Parquet format.
         
         Args:
             filename: Output filename (default: 'harmonized.parquet')
+            columns: Optional subset of columns to write (default: all).
+                    Only these columns are converted to Arrow, with the
+                    same field types as a full export.
             
         Returns:
             Path to output file
@@ -207,11 +431,27 @@ class HarmonizationPipeline:
         output_path = self.output_dir / filename
         
         try:
-            self.merged_df.to_parquet(output_path, index=False)
-            logger.info(f"Exported harmonized dataset to {output_path}")
+            # Convert once against the pinned schema and write directly,
+            # skipping pandas' to_parquet wrapper
+            schema = harmonized_arrow_schema()
+            if columns is None:
+                df = self.merged_df
+            else:
+                df = self.merged_df[columns]
+                schema = pa.schema([schema.field(col) for col in columns])
+            table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+            pq.write_table(
+                table,
+                output_path,
+                row_group_size=PARQUET_ROW_GROUP_SIZE,
+                compression=PARQUET_COMPRESSION,
+                compression_level=PARQUET_COMPRESSION_LEVEL,
+                use_dictionary=True,
+            )
+            logger.info("Exported harmonized dataset to %s", output_path)
             return output_path
         except Exception as e:
-            logger.error(f"Error exporting to parquet: {str(e)}")
+            logger.error("Error exporting to parquet: %s", e)
             return None
     
     def export_to_csv(self, filename: str = 'harmonized.csv') -> Path:
@@ -232,10 +472,10 @@ class HarmonizationPipeline:
         
         try:
             self.merged_df.to_csv(output_path, index=False)
-            logger.info(f"Exported harmonized dataset to {output_path}")
+            logger.info("Exported harmonized dataset to %s", output_path)
             return output_path
         except Exception as e:
-            logger.error(f"Error exporting to CSV: {str(e)}")
+            logger.error("Error exporting to CSV: %s", e)
             return None
     
     def get_statistics(self) -> Dict:
@@ -248,11 +488,13 @@ class HarmonizationPipeline:
         if self.merged_df is None:
             return {}
         
+        # The low-cardinality columns are categorical, so nunique() counts
+        # distinct codes rather than hashing strings
         return {
             'total_records': len(self.merged_df),
             'datasets': len(self.harmonized_dfs),
             'modalities': self.merged_df['modality'].nunique(),
-            'unique_diagnoses': self.merged_df['diagnosis_normalized'].nunique(),
+            'unique_diagnoses': self.merged_df['diagnosis_category'].nunique(),
             'datasets_breakdown': {
                 name: len(df) for name, df in self.harmonized_dfs.items()
             }
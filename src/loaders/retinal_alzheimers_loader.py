@@ -1,4 +1,7 @@
 from src.loaders.universal_loader import UniversalLoader
+from concurrent.futures import ThreadPoolExecutor
+import os
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -6,6 +9,31 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Lookups used when harmonizing records to the standard schema
+ALZHEIMERS_DIAGNOSIS_MAPPING = {
+    'alzheimers': "Alzheimer's Disease",
+    'mci': 'Mild Cognitive Impairment',
+    'controls': 'Normal',
+    'other_dementias': 'Other Dementia'
+}
+
+ALZHEIMERS_LATERALITY_MAPPING = {
+    'OD': 'Right',
+    'OS': 'Left',
+    'OU': 'Both'
+}
+
+ALZHEIMERS_GENDER_MAPPING = {'M': 'Male', 'F': 'Female', 'Male': 'Male', 'Female': 'Female'}
+
+IMAGE_EXTENSIONS = ('.tiff', '.jpg', '.jpeg', '.png')
+
+# Columns of the frame returned by load_raw_data(), before clinical data is merged
+ALZHEIMERS_RAW_COLUMNS = [
+    'image_id', 'patient_id', 'eye', 'diagnosis', 'cognitive_score',
+    'file_path', 'file_size', 'modality', 'research_context'
+]
+ALZHEIMERS_RAW_DTYPES = {'cognitive_score': 'Int64', 'file_size': 'int64'}
+
 class RetinalAlzheimersLoader(UniversalLoader):
     """
     Custom loader for Retinal Image Dataset for Early Detection of Alzheimer's.
@@ -17,7 +45,9 @@ class RetinalAlzheimersLoader(UniversalLoader):
     def __init__(self, dataset_name: str, data_path: str, column_mapping: Dict[str, str] = None):
         super().__init__(dataset_name, column_mapping)
         self.data_path = Path(data_path)
+        self._base_path = os.fspath(self.data_path)  # Joined with os.path on the scan path
         self.clinical_data = None
+        self._known_paths = set()  # Image paths found by the last load_raw_data()
 
     def load_raw_data(self) -> pd.DataFrame:
         """
@@ -28,42 +58,70 @@ class RetinalAlzheimersLoader(UniversalLoader):
         """
         data_records = []
 
-        # Process each diagnosis directory
+        # Process each diagnosis directory; the scans are independent and
+        # I/O-bound, so they run on threads (results keep directory order)
         diagnosis_dirs = ['alzheimers', 'mci', 'controls', 'other_dementias']
 
-        for diagnosis in diagnosis_dirs:
-            diagnosis_path = Path(self.data_path) / diagnosis
-            if diagnosis_path.exists():
-                for image_file in diagnosis_path.glob('*'):
-                    if image_file.suffix.lower() in ['.tiff', '.jpg', '.jpeg', '.png']:
-                        record = self._parse_alzheimers_filename(image_file, diagnosis)
-                        if record:
-                            data_records.append(record)
+        with ThreadPoolExecutor(max_workers=len(diagnosis_dirs)) as executor:
+            for records in executor.map(self._scan_diagnosis_dir, diagnosis_dirs):
+                data_records.extend(records)
 
-        df = pd.DataFrame(data_records)
+        self._known_paths = {record['file_path'] for record in data_records}
+        # Declared columns and dtypes: no per-column inference, and an empty
+        # scan still yields the full (empty) schema
+        df = pd.DataFrame(data_records, columns=ALZHEIMERS_RAW_COLUMNS).astype(ALZHEIMERS_RAW_DTYPES)
 
         # Load and merge clinical data if available
         df = self._merge_clinical_data(df)
 
         return df
 
-    def _parse_alzheimers_filename(self, image_file: Path, diagnosis: str) -> Optional[Dict]:
+    def _scan_diagnosis_dir(self, diagnosis: str) -> List[Dict]:
+        """
+        Parse every image in one diagnosis directory.
+
+        Args:
+            diagnosis: Diagnosis directory name
+
+        Returns:
+            List of parsed record dicts (empty if the directory is missing)
+        """
+        diagnosis_path = os.path.join(self._base_path, diagnosis)
+        if not os.path.isdir(diagnosis_path):
+            return []
+
+        records = []
+        # scandir entries carry their file type, so the is_file() filter
+        # costs no stat() call; the size lookup still makes one on POSIX
+        with os.scandir(diagnosis_path) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file():
+                    record = self._parse_alzheimers_filename(entry.path, diagnosis, entry.stat().st_size)
+                    if record:
+                        records.append(record)
+
+        return records
+
+    def _parse_alzheimers_filename(
+        self, image_file: str, diagnosis: str, file_size: Optional[int] = None
+    ) -> Optional[Dict]:
         """
         Parse Alzheimer's dataset filename with clinical information.
 
         Args:
             image_file: Path to image file
             diagnosis: Diagnosis directory name
+            file_size: Size in bytes if already known (stat()ed otherwise)
 
         Returns:
             Dict containing parsed record data or None if parsing fails
         """
-        filename = image_file.stem
+        filename = os.path.splitext(os.path.basename(image_file))[0]
         # Parse filename: {patient_id}_{eye}_{diagnosis}_{cognitive_score}.tiff
         parts = filename.split('_')
 
         if len(parts) < 4:
-            logger.warning(f"Invalid filename format: {filename}")
+            logger.warning("Invalid filename format: %s", filename)
             return None
 
         try:
@@ -78,8 +136,8 @@ class RetinalAlzheimersLoader(UniversalLoader):
                 'eye': eye,
                 'diagnosis': diagnosis_type,
                 'cognitive_score': cognitive_score,
-                'file_path': str(image_file),
-                'file_size': image_file.stat().st_size,
+                'file_path': os.fspath(image_file),
+                'file_size': file_size if file_size is not None else os.stat(image_file).st_size,
                 'modality': 'Fundus Photography',
                 'research_context': 'Alzheimer\'s Disease Biomarker Research'
             }
@@ -87,7 +145,7 @@ class RetinalAlzheimersLoader(UniversalLoader):
             return record
 
         except (ValueError, IndexError) as e:
-            logger.warning(f"Error parsing filename {filename}: {e}")
+            logger.warning("Error parsing filename %s: %s", filename, e)
             return None
 
     def _merge_clinical_data(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -107,18 +165,17 @@ class RetinalAlzheimersLoader(UniversalLoader):
                 clinical_df = pd.read_csv(clinical_file)
 
                 # Standardize patient ID format for merging
-                clinical_df['patient_id'] = clinical_df['patient_id'].apply(
-                    lambda x: f"ALZ_{x}" if not str(x).startswith('ALZ_') else x
-                )
+                patient_ids = clinical_df['patient_id'].astype(str)
+                clinical_df['patient_id'] = patient_ids.where(patient_ids.str.startswith('ALZ_'), 'ALZ_' + patient_ids)
 
                 # Merge on patient_id
                 merged_df = pd.merge(df, clinical_df, on='patient_id', how='left')
 
-                logger.info(f"Merged clinical data for {len(merged_df)} records")
+                logger.info("Merged clinical data for %d records", len(merged_df))
                 return merged_df
 
             except Exception as e:
-                logger.warning(f"Error loading clinical data: {e}")
+                logger.warning("Error loading clinical data: %s", e)
                 return df
         else:
             logger.info("No clinical data file found, proceeding with image data only")
@@ -141,13 +198,13 @@ class RetinalAlzheimersLoader(UniversalLoader):
         missing_data = df[required_fields].isnull().sum()
 
         if missing_data.any():
-            logger.warning(f"Missing data in required fields: {missing_data}")
+            logger.warning("Missing data in required fields: %s", missing_data)
 
         # Validate diagnosis categories
         valid_diagnoses = ['alzheimers', 'mci', 'controls', 'other_dementias']
         invalid_diagnosis = df[~df['diagnosis'].isin(valid_diagnoses)]
         if len(invalid_diagnosis) > 0:
-            logger.warning(f"Invalid diagnosis values: {len(invalid_diagnosis)} records")
+            logger.warning("Invalid diagnosis values: %d records", len(invalid_diagnosis))
 
         # Validate cognitive scores
         if 'cognitive_score' in df.columns:
@@ -156,20 +213,47 @@ class RetinalAlzheimersLoader(UniversalLoader):
                 ((df['cognitive_score'] < 0) | (df['cognitive_score'] > 30))
             ]
             if len(invalid_scores) > 0:
-                logger.warning(f"Invalid cognitive scores: {len(invalid_scores)} records")
+                logger.warning("Invalid cognitive scores: %d records", len(invalid_scores))
 
         # Clinical consistency checks
         consistency_issues = self._check_clinical_consistency(df)
         if consistency_issues:
-            logger.warning(f"Clinical consistency issues: {consistency_issues}")
+            logger.warning("Clinical consistency issues: %s", consistency_issues)
 
-        # File existence checks
-        missing_files = df[~df['file_path'].apply(lambda x: Path(x).exists())]
-        if len(missing_files) > 0:
-            logger.warning(f"Missing image files: {len(missing_files)} records")
+        # File existence checks: paths seen by load_raw_data() are known to
+        # exist; any others are checked with one directory listing per folder
+        unknown_paths = df.loc[~df['file_path'].isin(self._known_paths), 'file_path']
+        missing_files = self._count_missing_files(unknown_paths)
+        if missing_files > 0:
+            logger.warning("Missing image files: %d records", missing_files)
 
         return df
 
+    @staticmethod
+    def _count_missing_files(paths: pd.Series) -> int:
+        """
+        Count paths that do not exist, listing each parent directory once.
+
+        Args:
+            paths: File paths to check
+
+        Returns:
+            Number of paths with no matching directory entry
+        """
+        names_by_dir = {}
+        missing = 0
+        for path in paths:
+            directory, name = os.path.split(str(path))
+            if directory not in names_by_dir:
+                try:
+                    with os.scandir(directory or '.') as entries:
+                        names_by_dir[directory] = {entry.name for entry in entries}
+                except OSError:
+                    names_by_dir[directory] = set()
+            if name not in names_by_dir[directory]:
+                missing += 1
+        return missing
+
     def _check_clinical_consistency(self, df: pd.DataFrame) -> List[str]:
         """
         Check consistency between diagnosis and clinical measures.
@@ -183,23 +267,22 @@ class RetinalAlzheimersLoader(UniversalLoader):
         issues = []
 
         if 'cognitive_score' in df.columns and 'diagnosis' in df.columns:
+            # Masks are counted directly; no row subsets are materialized
+            scores = df['cognitive_score']
+            diagnosis = df['diagnosis'].to_numpy()
+            scored = scores.notna().to_numpy()
+            low_score = (scores < 24).to_numpy(dtype=bool, na_value=False)
+            high_score = (scores > 20).to_numpy(dtype=bool, na_value=False)
+
             # Check for normal controls with low cognitive scores
-            normal_low_score = df[
-                (df['diagnosis'] == 'controls') &
-                (df['cognitive_score'].notna()) &
-                (df['cognitive_score'] < 24)
-            ]
-            if len(normal_low_score) > 0:
-                issues.append(f"{len(normal_low_score)} normal controls have low cognitive scores")
+            normal_low_score = np.count_nonzero((diagnosis == 'controls') & scored & low_score)
+            if normal_low_score > 0:
+                issues.append(f"{normal_low_score} normal controls have low cognitive scores")
 
             # Check for Alzheimer's cases with high cognitive scores
-            alzheimers_high_score = df[
-                (df['diagnosis'] == 'alzheimers') &
-                (df['cognitive_score'].notna()) &
-                (df['cognitive_score'] > 20)
-            ]
-            if len(alzheimers_high_score) > 0:
-                issues.append(f"{len(alzheimers_high_score)} Alzheimer's cases have high cognitive scores")
+            alzheimers_high_score = np.count_nonzero((diagnosis == 'alzheimers') & scored & high_score)
+            if alzheimers_high_score > 0:
+                issues.append(f"{alzheimers_high_score} Alzheimer's cases have high cognitive scores")
 
         return issues
 
@@ -213,27 +296,12 @@ class RetinalAlzheimersLoader(UniversalLoader):
         Returns:
             Dict: Harmonized record
         """
-        # Diagnosis mapping
-        diagnosis_mapping = {
-            'alzheimers': "Alzheimer's Disease",
-            'mci': 'Mild Cognitive Impairment',
-            'controls': 'Normal',
-            'other_dementias': 'Other Dementia'
-        }
-
-        # Laterality mapping
-        laterality_mapping = {
-            'OD': 'Right',
-            'OS': 'Left',
-            'OU': 'Both'
-        }
-
         harmonized = {
             'record_id': record['image_id'],
             'patient_id': record['patient_id'],
             'modality': 'Fundus Photography',
-            'laterality': laterality_mapping.get(record.get('eye'), 'Unknown'),
-            'diagnosis_category': diagnosis_mapping.get(record['diagnosis'], 'Other'),
+            'laterality': ALZHEIMERS_LATERALITY_MAPPING.get(record.get('eye'), 'Unknown'),
+            'diagnosis_category': ALZHEIMERS_DIAGNOSIS_MAPPING.get(record['diagnosis'], 'Other'),
             'anatomy': 'Retina',
             'image_path': record['file_path'],
             'clinical_findings': {}
@@ -251,11 +319,78 @@ class RetinalAlzheimersLoader(UniversalLoader):
 
         if pd.notna(record.get('gender')):
             harmonized['demographics'] = harmonized.get('demographics', {})
-            gender_mapping = {'M': 'Male', 'F': 'Female', 'Male': 'Male', 'Female': 'Female'}
-            harmonized['demographics']['gender'] = gender_mapping.get(record['gender'], record['gender'])
+            harmonized['demographics']['gender'] = ALZHEIMERS_GENDER_MAPPING.get(record['gender'], record['gender'])
 
         return harmonized
 
+    def harmonize_alzheimers_df(self, df: pd.DataFrame) -> List[Dict]:
+        """
+        Harmonize every Alzheimer's record in a DataFrame to the standard schema.
+
+        Same output as calling harmonize_alzheimers_record() on each row of
+        df.to_dict('records'), but the lookups and missing-value checks run
+        once per column instead of once per row.
+
+        Args:
+            df: DataFrame of raw Alzheimer's records
+
+        Returns:
+            List[Dict]: Harmonized records, in row order
+        """
+        laterality = self._optional_column(df, 'eye').map(ALZHEIMERS_LATERALITY_MAPPING).fillna('Unknown')
+        diagnosis = df['diagnosis'].map(ALZHEIMERS_DIAGNOSIS_MAPPING).fillna('Other')
+        gender = self._optional_column(df, 'gender')
+        gender = self._none_for_missing(gender.map(ALZHEIMERS_GENDER_MAPPING).fillna(gender))
+
+        columns = zip(
+            df['image_id'].tolist(),
+            df['patient_id'].tolist(),
+            laterality.tolist(),
+            diagnosis.tolist(),
+            df['file_path'].tolist(),
+            self._optional_column(df, 'cognitive_score').tolist(),
+            self._optional_column(df, 'age').tolist(),
+            gender.tolist(),
+        )
+
+        records = []
+        for image_id, patient_id, side, category, image_path, score, age, sex in columns:
+            harmonized = {
+                'record_id': image_id,
+                'patient_id': patient_id,
+                'modality': 'Fundus Photography',
+                'laterality': side,
+                'diagnosis_category': category,
+                'anatomy': 'Retina',
+                'image_path': image_path,
+                'clinical_findings': {}
+            }
+
+            if score is not None:
+                harmonized['clinical_findings']['cognitive_score'] = score
+                harmonized['clinical_findings']['cognitive_assessment_type'] = 'MMSE'
+
+            if age is not None:
+                harmonized['demographics'] = {'age': int(age)}
+
+            if sex is not None:
+                harmonized.setdefault('demographics', {})['gender'] = sex
+
+            records.append(harmonized)
+
+        return records
+
+    @classmethod
+    def _optional_column(cls, df: pd.DataFrame, column: str) -> pd.Series:
+        """Column as objects with None for missing values (all None if the column is absent)."""
+        if column not in df.columns:
+            return pd.Series([None] * len(df), index=df.index, dtype=object)
+        return cls._none_for_missing(df[column])
+
+    @staticmethod
+    def _none_for_missing(series: pd.Series) -> pd.Series:
+        return series.astype(object).where(series.notna(), None)
+
     def generate_clinical_report(self, df: pd.DataFrame) -> Dict:
         """
         Generate clinical summary report for the Alzheimer's dataset.
@@ -1,4 +1,7 @@
 from src.loaders.universal_loader import UniversalLoader
+from concurrent.futures import ThreadPoolExecutor
+import os
+import re
 import pandas as pd
 import numpy as np
 from pathlib import Path
@@ -7,6 +10,70 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Slice filenames: {class}_{patient_id}_{slice_number}[_...].tiff
+OCT_FILENAME_PATTERN = re.compile(r'([^_]*)_([^_]*)_(\d+)(?:_|$)')
+
+OCT_DIAGNOSIS_MAPPING = {
+    'CNV': 'Choroidal Neovascularization',
+    'DME': 'Diabetic Macular Edema',
+    'DRUSEN': 'Drusen',
+    'NORMAL': 'Normal'
+}
+
+# Columns of the frame returned by RetinalOCTLoader.load_raw_data(), one row per slice
+SLICE_COLUMNS = [
+    'image_id', 'patient_id', 'volume_id', 'slice_number',
+    'diagnosis_class',
+    'file_path', 'file_size',
+    'modality', 'wavelength', 'field_of_view', 'axial_resolution', 'transverse_resolution', 'scan_pattern',
+    'total_slices_in_volume', 'estimated_volume_slices', 'volume_depth_um', 'slice_range',
+    'is_first_slice', 'is_last_slice', 'relative_position',
+]
+
+# Columns collected per slice while scanning; the remaining SLICE_COLUMNS
+# are derived from them in load_raw_data()
+RAW_SLICE_COLUMNS = ['filename', 'patient_id', 'volume_id', 'slice_number', 'diagnosis_class', 'file_path', 'file_size']
+
+# Fixed acquisition parameters (typical OCT values) stamped on every slice
+OCT_ACQUISITION_PARAMETERS = {
+    'modality': 'Optical Coherence Tomography',
+    'wavelength': 840,  # nm, typical for OCT
+    'field_of_view': '6x6',  # mm
+    'axial_resolution': 5,  # μm
+    'transverse_resolution': 15,  # μm
+    'scan_pattern': 'raster',
+}
+
+SLICE_DEPTH_UM = 4.5  # μm per slice (approximate)
+
+# A volume id is only unique within its class folder (load_raw_data() groups
+# the same way), so volumes are keyed on both columns
+VOLUME_KEY = ['diagnosis_class', 'volume_id']
+
+# Columns that are constant within a volume (see split_volume_tables())
+VOLUME_COLUMNS = [
+    *VOLUME_KEY, *OCT_ACQUISITION_PARAMETERS,
+    'total_slices_in_volume', 'estimated_volume_slices', 'volume_depth_um', 'slice_range',
+]
+
+# Repeated per-slice strings are stored as categories; the fixed acquisition
+# parameters and slice counts use the narrowest integer type that holds them
+# (a volume of more than 65535 slices fails loudly rather than wrapping)
+SLICE_DTYPES = {
+    'diagnosis_class': 'category',
+    'modality': 'category',
+    'field_of_view': 'category',
+    'scan_pattern': 'category',
+    'slice_range': 'category',
+    'wavelength': np.uint16,
+    'axial_resolution': np.uint8,
+    'transverse_resolution': np.uint8,
+    'slice_number': np.uint16,
+    'total_slices_in_volume': np.uint16,
+    'estimated_volume_slices': np.uint16,
+}
+
+
 class RetinalOCTLoader(UniversalLoader):
     """
     Custom loader for Retinal OCT Images dataset.
@@ -18,7 +85,9 @@ class RetinalOCTLoader(UniversalLoader):
     def __init__(self, dataset_name: str, data_path: str, column_mapping: Dict[str, str] = None):
         super().__init__(dataset_name, column_mapping)
         self.data_path = Path(data_path)
+        self._base_path = os.fspath(self.data_path)  # Joined with os.path on the scan path
         self.volume_info = {}  # Cache for volume metadata
+        self._known_files = set()  # Slice paths found by the last load_raw_data()
 
     def load_raw_data(self) -> pd.DataFrame:
         """
@@ -27,28 +96,70 @@ class RetinalOCTLoader(UniversalLoader):
         Returns:
             pd.DataFrame: DataFrame with one row per OCT slice, including volume metadata
         """
-        data_records = []
+        # Start from a fresh scan so files deleted since a previous load
+        # are stat()ed again by validate_oct_data()
+        self._known_files = set()
+
+        # One list per raw column (no per-slice record dicts)
+        columns = {name: [] for name in RAW_SLICE_COLUMNS}
 
-        # Process each class directory
+        # Process each class directory; the directory walks are independent
+        # and I/O-bound, so they run on threads (results keep class order)
         class_dirs = ['CNV', 'DME', 'DRUSEN', 'NORMAL']
 
-        for class_name in class_dirs:
-            class_path = Path(self.data_path) / class_name
-            if class_path.exists():
-                # Group files by volume (patient)
-                volume_groups = self._group_files_by_volume(class_path)
+        with ThreadPoolExecutor(max_workers=len(class_dirs)) as executor:
+            class_volumes = list(executor.map(self._scan_class_dir, class_dirs))
+
+        for class_name, volume_groups in zip(class_dirs, class_volumes):
+            for volume_id, files in volume_groups.items():
+                # Append the columns for every slice in the volume
+                self._append_slice_columns(columns, volume_id, files, class_name)
+
+        # Each list is converted straight to its final dtype and released
+        # before the next, so the lists and the frame never coexist in full
+        data = {name: pd.Series(columns.pop(name), dtype=SLICE_DTYPES.get(name)) for name in RAW_SLICE_COLUMNS}
+        slice_numbers = data['slice_number']
+
+        # Volume statistics, reduced per volume and broadcast back to its slices
+        by_volume = slice_numbers.groupby([data['diagnosis_class'], data['volume_id']], sort=False, observed=True)
+        first_slice = by_volume.transform('min')
+        last_slice = by_volume.transform('max')
+        data['total_slices_in_volume'] = by_volume.transform('size').astype(SLICE_DTYPES['total_slices_in_volume'])
+        data['estimated_volume_slices'] = last_slice
+        data['volume_depth_um'] = last_slice * SLICE_DEPTH_UM
+        data['slice_range'] = (first_slice.astype(str) + '-' + last_slice.astype(str)).astype('category')
+
+        for name, value in OCT_ACQUISITION_PARAMETERS.items():
+            data[name] = pd.Series(value, index=slice_numbers.index, dtype=SLICE_DTYPES[name])
+
+        # Identifiers and processing flags, computed over whole columns
+        filenames = data.pop('filename').astype(str)
+        data['image_id'] = 'OCT_' + filenames
+        data['is_first_slice'] = slice_numbers.eq(1)
+        data['is_last_slice'] = slice_numbers.eq(last_slice)
+        data['relative_position'] = slice_numbers / last_slice
+
+        # Assembled in output order without copying the columns again
+        return pd.DataFrame({name: data[name] for name in SLICE_COLUMNS}, copy=False)
+
+    def _scan_class_dir(self, class_name: str) -> Dict[str, List[Dict]]:
+        """
+        Group the files of one class directory by volume.
 
-                for volume_id, files in volume_groups.items():
-                    volume_metadata = self._extract_volume_metadata(volume_id, files, class_name)
+        Args:
+            class_name: Diagnosis class directory name
 
-                    # Create records for each slice in the volume
-                    for file_info in files:
-                        record = self._create_slice_record(file_info, volume_metadata)
-                        data_records.append(record)
+        Returns:
+            Dict mapping volume IDs to lists of file information (empty if the directory is missing)
+        """
+        class_path = os.path.join(self._base_path, class_name)
+        if not os.path.isdir(class_path):
+            return {}
 
-        return pd.DataFrame(data_records)
+        # Group files by volume (patient)
+        return self._group_files_by_volume(class_path)
 
-    def _group_files_by_volume(self, class_path: Path) -> Dict[str, List[Dict]]:
+    def _group_files_by_volume(self, class_path: str) -> Dict[str, List[Dict]]:
         """
         Group OCT files by volume (patient) based on filename patterns.
 
@@ -60,20 +171,26 @@ class RetinalOCTLoader(UniversalLoader):
         """
         volume_groups = {}
 
-        for tiff_file in class_path.glob('*.tiff'):
-            filename = tiff_file.stem
-            # Parse filename: {class}_{patient_id}_{slice_number}.tiff
-            parts = filename.split('_')
+        # scandir entries carry their file type, so the is_file() filter costs
+        # no stat() call; entry.stat() for the size still makes one on POSIX
+        with os.scandir(class_path) as entries:
+            tiff_entries = [e for e in entries if e.name.endswith('.tiff') and e.is_file()]
+
+        for entry in tiff_entries:
+            filename = entry.name[:-len('.tiff')]
+            match = OCT_FILENAME_PATTERN.match(filename)
 
-            if len(parts) >= 3:
-                volume_id = f"{parts[0]}_{parts[1]}"  # e.g., "CNV_001"
-                slice_number = int(parts[2])
+            if match:
+                class_code, patient_id, slice_number = match.groups()
+                volume_id = f"{class_code}_{patient_id}"  # e.g., "CNV_001"
 
+                self._known_files.add(entry.path)
                 file_info = {
-                    'filepath': tiff_file,
+                    'filepath': entry.path,
                     'filename': filename,
-                    'slice_number': slice_number,
-                    'file_size': tiff_file.stat().st_size
+                    'patient_id': patient_id,
+                    'slice_number': int(slice_number),
+                    'file_size': entry.stat().st_size
                 }
 
                 if volume_id not in volume_groups:
@@ -86,94 +203,28 @@ class RetinalOCTLoader(UniversalLoader):
 
         return volume_groups
 
-    def _extract_volume_metadata(self, volume_id: str, files: List[Dict], class_name: str) -> Dict:
+    def _append_slice_columns(self, columns: Dict[str, List], volume_id: str, files: List[Dict], class_name: str):
         """
-        Extract metadata for an OCT volume.
+        Append the raw columns of every slice in a volume to the column lists.
 
         Args:
+            columns: Column lists keyed by RAW_SLICE_COLUMNS name (extended in place)
             volume_id: Volume identifier
-            files: List of file information for this volume
+            files: Information about the slice files, in slice order
             class_name: Diagnosis class
-
-        Returns:
-            Dict containing volume metadata
         """
-        # Calculate volume statistics
-        slice_count = len(files)
-        total_size = sum(f['file_size'] for f in files)
-        slice_numbers = [f['slice_number'] for f in files]
-
-        # Estimate volume dimensions (typical OCT parameters)
-        estimated_slices = max(slice_numbers) if slice_numbers else 61
-        volume_depth = estimated_slices * 4.5  # μm per slice (approximate)
-
-        metadata = {
-            'volume_id': f"OCT_{volume_id}",
-            'diagnosis_class': class_name,
-            'total_slices': slice_count,
-            'estimated_volume_slices': estimated_slices,
-            'volume_depth_um': volume_depth,
-            'total_file_size': total_size,
-            'slice_range': f"{min(slice_numbers)}-{max(slice_numbers)}" if slice_numbers else "unknown",
-            'modality': 'Optical Coherence Tomography',
-            'wavelength': 840,  # nm, typical for OCT
-            'field_of_view': '6x6',  # mm
-            'axial_resolution': 5,  # μm
-            'transverse_resolution': 15,  # μm
-            'scan_pattern': 'raster'
-        }
-
-        return metadata
+        n = len(files)
 
-    def _create_slice_record(self, file_info: Dict, volume_metadata: Dict) -> Dict:
-        """
-        Create a data record for a single OCT slice.
+        # Slice-level values
+        columns['filename'].extend(f['filename'] for f in files)
+        columns['patient_id'].extend(f"OCT_{f['patient_id']}" for f in files)
+        columns['slice_number'].extend(f['slice_number'] for f in files)
+        columns['file_path'].extend(f['filepath'] for f in files)
+        columns['file_size'].extend(f['file_size'] for f in files)
 
-        Args:
-            file_info: Information about the slice file
-            volume_metadata: Metadata for the parent volume
-
-        Returns:
-            Dict containing slice record data
-        """
-        filename = file_info['filename']
-        parts = filename.split('_')
-
-        record = {
-            # Primary identifiers
-            'image_id': f"OCT_{filename}",
-            'patient_id': f"OCT_{parts[1]}",  # Extract patient ID
-            'volume_id': volume_metadata['volume_id'],
-            'slice_number': file_info['slice_number'],
-
-            # Diagnosis and classification
-            'diagnosis_class': volume_metadata['diagnosis_class'],
-
-            # File information
-            'file_path': str(file_info['filepath']),
-            'file_size': file_info['file_size'],
-
-            # OCT-specific metadata
-            'modality': volume_metadata['modality'],
-            'wavelength': volume_metadata['wavelength'],
-            'field_of_view': volume_metadata['field_of_view'],
-            'axial_resolution': volume_metadata['axial_resolution'],
-            'transverse_resolution': volume_metadata['transverse_resolution'],
-            'scan_pattern': volume_metadata['scan_pattern'],
-
-            # Volume context
-            'total_slices_in_volume': volume_metadata['total_slices'],
-            'estimated_volume_slices': volume_metadata['estimated_volume_slices'],
-            'volume_depth_um': volume_metadata['volume_depth_um'],
-            'slice_range': volume_metadata['slice_range'],
-
-            # Processing flags
-            'is_first_slice': file_info['slice_number'] == 1,
-            'is_last_slice': file_info['slice_number'] == volume_metadata['estimated_volume_slices'],
-            'relative_position': file_info['slice_number'] / volume_metadata['estimated_volume_slices']
-        }
-
-        return record
+        # Volume identity and diagnosis, broadcast to every slice
+        columns['volume_id'].extend([f"OCT_{volume_id}"] * n)
+        columns['diagnosis_class'].extend([class_name] * n)
 
     def validate_oct_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -192,23 +243,25 @@ class RetinalOCTLoader(UniversalLoader):
         missing_data = df[required_fields].isnull().sum()
 
         if missing_data.any():
-            logger.warning(f"Missing data in required fields: {missing_data}")
+            logger.warning("Missing data in required fields: %s", missing_data)
 
         # Validate diagnosis classes
         valid_classes = ['CNV', 'DME', 'DRUSEN', 'NORMAL']
         invalid_class = df[~df['diagnosis_class'].isin(valid_classes)]
         if len(invalid_class) > 0:
-            logger.warning(f"Invalid diagnosis classes: {len(invalid_class)} records")
+            logger.warning("Invalid diagnosis classes: %d records", len(invalid_class))
 
         # Volume consistency checks
         volume_consistency = self._check_volume_consistency(df)
         if not volume_consistency['valid']:
-            logger.warning(f"Volume consistency issues: {volume_consistency['issues']}")
+            logger.warning("Volume consistency issues: %s", volume_consistency['issues'])
 
-        # File existence checks
-        missing_files = df[~df['file_path'].apply(lambda x: Path(x).exists())]
-        if len(missing_files) > 0:
-            logger.warning(f"Missing OCT files: {len(missing_files)} records")
+        # File existence checks: slices found while loading are known to exist;
+        # only paths from elsewhere are stat()ed
+        unknown_paths = df.loc[~df['file_path'].isin(self._known_files), 'file_path']
+        missing_files = sum(not os.path.exists(path) for path in unknown_paths)
+        if missing_files > 0:
+            logger.warning("Missing OCT files: %d records", missing_files)
 
         return df
 
@@ -224,16 +277,22 @@ class RetinalOCTLoader(UniversalLoader):
         """
         issues = []
 
-        # Check slice numbering within volumes
-        for volume_id, volume_data in df.groupby('volume_id'):
-            slice_numbers = sorted(volume_data['slice_number'].unique())
-            expected_range = list(range(1, len(slice_numbers) + 1))
-
-            if slice_numbers != expected_range:
+        # Per-volume reductions in one groupby pass; distinct slice numbers
+        # run 1..n exactly when the smallest is 1 and the largest is n
+        slices = df.groupby('volume_id')['slice_number']
+        stats = slices.agg(['min', 'max', 'size'])
+        stats['nunique'] = slices.nunique(dropna=False)
+        irregular = (stats['min'] != 1) | (stats['max'] != stats['nunique'])
+        duplicated = stats['nunique'] != stats['size']
+
+        # Only offending volumes are revisited, to report their slice numbers
+        for volume_id in stats.index[irregular | duplicated]:
+            if irregular[volume_id]:
+                slice_numbers = sorted(slices.get_group(volume_id).unique().tolist())
                 issues.append(f"Volume {volume_id}: irregular slice numbering {slice_numbers}")
 
             # Check for duplicate slices
-            if len(slice_numbers) != len(volume_data):
+            if duplicated[volume_id]:
                 issues.append(f"Volume {volume_id}: duplicate slices detected")
 
         return {
@@ -241,6 +300,28 @@ class RetinalOCTLoader(UniversalLoader):
             'issues': issues
         }
 
+    def split_volume_tables(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Split the slice frame into a volume table and a narrow slice table.
+
+        The slice frame repeats every volume-level field on each slice; the
+        volume table stores them once per volume, and the slice table keeps
+        only per-slice fields plus the VOLUME_KEY columns (diagnosis_class,
+        volume_id) to join back on. volume_id alone is not a key: the same
+        id can occur in more than one class folder.
+
+        Args:
+            df: DataFrame with OCT data, as returned by load_raw_data()
+
+        Returns:
+            Tuple of (volumes, slices) DataFrames
+        """
+        volumes = df.drop_duplicates(VOLUME_KEY)[VOLUME_COLUMNS].reset_index(drop=True)
+        slice_columns = VOLUME_KEY + [c for c in df.columns if c not in VOLUME_COLUMNS]
+        slices = df[slice_columns]
+
+        return volumes, slices
+
     def get_volume_statistics(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Generate statistics for OCT volumes.
@@ -251,22 +332,25 @@ class RetinalOCTLoader(UniversalLoader):
         Returns:
             pd.DataFrame: Volume-level statistics
         """
-        volume_stats = []
-
-        for volume_id, volume_data in df.groupby('volume_id'):
-            stats = {
-                'volume_id': volume_id,
-                'total_slices': len(volume_data),
-                'diagnosis_class': volume_data['diagnosis_class'].iloc[0],
-                'total_file_size_mb': volume_data['file_size'].sum() / (1024 * 1024),
-                'slice_number_range': f"{volume_data['slice_number'].min()}-{volume_data['slice_number'].max()}",
-                'estimated_volume_depth_um': volume_data['volume_depth_um'].iloc[0],
-                'wavelength': volume_data['wavelength'].iloc[0],
-                'field_of_view': volume_data['field_of_view'].iloc[0]
-            }
-            volume_stats.append(stats)
-
-        return pd.DataFrame(volume_stats)
+        # All per-volume reductions in one groupby pass
+        stats = df.groupby('volume_id').agg(
+            total_slices=('slice_number', 'size'),
+            diagnosis_class=('diagnosis_class', 'first'),
+            total_file_size=('file_size', 'sum'),
+            slice_min=('slice_number', 'min'),
+            slice_max=('slice_number', 'max'),
+            estimated_volume_depth_um=('volume_depth_um', 'first'),
+            wavelength=('wavelength', 'first'),
+            field_of_view=('field_of_view', 'first'),
+        )
+
+        stats['total_file_size_mb'] = stats['total_file_size'] / (1024 * 1024)
+        stats['slice_number_range'] = stats['slice_min'].astype(str) + '-' + stats['slice_max'].astype(str)
+
+        return stats.reset_index()[[
+            'volume_id', 'total_slices', 'diagnosis_class', 'total_file_size_mb', 'slice_number_range',
+            'estimated_volume_depth_um', 'wavelength', 'field_of_view'
+        ]]
 
     def harmonize_oct_record(self, record: Dict) -> Dict:
         """
@@ -278,20 +362,12 @@ class RetinalOCTLoader(UniversalLoader):
         Returns:
             Dict: Harmonized record
         """
-        # Diagnosis mapping
-        diagnosis_mapping = {
-            'CNV': 'Choroidal Neovascularization',
-            'DME': 'Diabetic Macular Edema',
-            'DRUSEN': 'Drusen',
-            'NORMAL': 'Normal'
-        }
-
         harmonized = {
             'record_id': record['image_id'],
             'patient_id': record['patient_id'],
             'modality': 'Optical Coherence Tomography',
             'laterality': 'Unknown',  # OCT volumes typically don't specify eye
-            'diagnosis_category': diagnosis_mapping.get(record['diagnosis_class'], 'Other'),
+            'diagnosis_category': OCT_DIAGNOSIS_MAPPING.get(record['diagnosis_class'], 'Other'),
             'anatomy': 'Retina',
             'image_path': record['file_path'],
             'clinical_findings': {
@@ -306,4 +382,59 @@ class RetinalOCTLoader(UniversalLoader):
             }
         }
 
-        return harmonized
\ No newline at end of file
+        return harmonized
+
+    def harmonize_oct_dataframe(self, df: pd.DataFrame) -> List[Dict]:
+        """
+        Harmonize every OCT slice in a DataFrame to the standard schema.
+
+        Same output as calling harmonize_oct_record() on each row of
+        df.to_dict('records'), but the diagnosis lookup runs once per column
+        and the rows are read from column lists instead of row dicts.
+
+        Args:
+            df: DataFrame with OCT data, as returned by load_raw_data()
+
+        Returns:
+            List[Dict]: Harmonized records, in row order
+        """
+        diagnosis = df['diagnosis_class'].astype(object).map(OCT_DIAGNOSIS_MAPPING).fillna('Other')
+
+        columns = zip(
+            df['image_id'].tolist(),
+            df['patient_id'].tolist(),
+            diagnosis.tolist(),
+            df['file_path'].tolist(),
+            df['volume_id'].tolist(),
+            df['slice_number'].tolist(),
+            df['total_slices_in_volume'].tolist(),
+            df['relative_position'].tolist(),
+            df['wavelength'].tolist(),
+            df['field_of_view'].tolist(),
+            df['axial_resolution'].tolist(),
+            df['transverse_resolution'].tolist(),
+        )
+
+        return [
+            {
+                'record_id': image_id,
+                'patient_id': patient_id,
+                'modality': 'Optical Coherence Tomography',
+                'laterality': 'Unknown',  # OCT volumes typically don't specify eye
+                'diagnosis_category': category,
+                'anatomy': 'Retina',
+                'image_path': image_path,
+                'clinical_findings': {
+                    'volume_id': volume_id,
+                    'slice_number': slice_number,
+                    'total_slices': total_slices,
+                    'relative_position': position,
+                    'wavelength': wavelength,
+                    'field_of_view': field_of_view,
+                    'axial_resolution': axial_resolution,
+                    'transverse_resolution': transverse_resolution
+                }
+            }
+            for (image_id, patient_id, category, image_path, volume_id, slice_number, total_slices,
+                 position, wavelength, field_of_view, axial_resolution, transverse_resolution) in columns
+        ]
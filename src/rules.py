@@ -47,7 +47,13 @@ Designed for multi-dataset harmonization across Kaggle, clinical trials, and hos
 """
 
 from typing import Optional, Dict, List, Tuple, Set
+from functools import lru_cache
 import re
+import sys
+import unicodedata
+
+import numpy as np
+import pandas as pd
 
 
 # ============================================================================
@@ -372,6 +378,10 @@ DIAGNOSIS_MAPPING = {
     'benign': ('Normal', None),
 }
 
+# Every diagnosis category as one fixed categorical dtype, so harmonized
+# columns from different datasets share categories and concatenate cheaply
+DIAGNOSIS_CATEGORY_DTYPE = pd.CategoricalDtype(sorted({category for category, _ in DIAGNOSIS_MAPPING.values()}))
+
 # ============================================================================
 # COMPREHENSIVE SEVERITY GRADING SCALES (By Condition)
 # ============================================================================
@@ -432,6 +442,24 @@ SEVERITY_GRADING = {
     },
 }
 
+# Flat (condition, level) -> label view of SEVERITY_GRADING: one hash probe
+# instead of two nested lookups; strings are interned so the labels handed
+# out compare by identity downstream
+SEVERITY_FLAT = {
+    (sys.intern(condition), level): sys.intern(label)
+    for condition, grades in SEVERITY_GRADING.items()
+    for level, label in grades.items()
+}
+
+# Severity tiers keyed by SEVERITY_GRADING level, most severe first
+SEVERITY_KEYWORD_TIERS = [
+    (4, ['proliferative', 'terminal', 'hypermature', 'advanced']),
+    (3, ['severe', 'advanced', 'significant', 'substantial']),
+    (2, ['moderate', 'intermediate', 'medium']),
+    (1, ['mild', 'minimal', 'early', 'slight']),
+    (0, ['no ', 'without', 'negative', 'absent', 'none']),
+]
+
 # ============================================================================
 # CLINICAL FINDING KEYWORDS (Signs Visible in Images)
 # ============================================================================
@@ -514,7 +542,7 @@ MODALITY_PATTERNS = {
     ],
     'OCTA': [
         'octa', 'oct angiography', 'oct angio', 'angiography', 'angioography',
-        'optical coherence tomography angiography', 'octa', 'angiogram',
+        'optical coherence tomography angiography', 'angiogram',
         'vascular imaging', 'capillary network', 'vessel density'
     ],
     'Slit-Lamp': [
@@ -569,7 +597,7 @@ LATERALITY_PATTERNS = {
         # Filename patterns
         '_r.', '_r_', '-r-', '_od', '-od', '_right', '-right',
         # Latin abbreviations
-        'o.d.', 'od', 'odex',
+        'o.d.', 'odex',
         # Alternative codes
         'droit',  # French
         'derecha',  # Spanish
@@ -581,7 +609,7 @@ LATERALITY_PATTERNS = {
         # Filename patterns
         '_l.', '_l_', '-l-', '_os', '-os', '_left', '-left',
         # Latin abbreviations
-        'o.s.', 'os', 'osex',
+        'o.s.', 'osex',
         # Alternative codes
         'gauche',  # French
         'izquierda',  # Spanish
@@ -629,8 +657,12 @@ AGE_RANGES = {
     'elderly': (65, 150),
 }
 
+# AGE_RANGES as sorted band edges + labels for vectorized bucketing
+_AGE_LABELS = np.array(list(AGE_RANGES), dtype=object)
+_AGE_EDGES = np.array([low for low, _ in AGE_RANGES.values()] + [max(high for _, high in AGE_RANGES.values())], dtype=float)
+
 SEX_MAPPINGS = {
-    'M': ['m', 'male', 'man', 'male', 'masculino', 'homme', 'herr'],
+    'M': ['m', 'male', 'man', 'masculino', 'homme', 'herr'],
     'F': ['f', 'female', 'woman', 'femenino', 'femme', 'frau'],
     'O': ['o', 'other', 'non-binary', 'prefer not to say', 'unknown'],
     'U': ['u', 'unknown', 'unclear', 'not specified', 'n/a', 'na'],
@@ -665,6 +697,276 @@ STUDY_KEYWORDS = {
     'endpoint': ['endpoint', 'final', 'end', 'conclusion'],
 }
 
+# Freeze the keyword tables: the automata and lookup tables below are
+# compiled from them once at import, so they must not change afterwards.
+# Repeated entries are dropped, keeping the first occurrence.
+
+
+def _freeze(table: Dict[str, List[str]]) -> Dict[str, Tuple[str, ...]]:
+    return {key: tuple(sys.intern(value) for value in dict.fromkeys(values)) for key, values in table.items()}
+
+
+CLINICAL_FINDINGS_KEYWORDS = _freeze(CLINICAL_FINDINGS_KEYWORDS)
+MODALITY_PATTERNS = _freeze(MODALITY_PATTERNS)
+LATERALITY_PATTERNS = _freeze(LATERALITY_PATTERNS)
+IMAGE_QUALITY_KEYWORDS = _freeze(IMAGE_QUALITY_KEYWORDS)
+SEX_MAPPINGS = _freeze(SEX_MAPPINGS)
+ETHNICITY_MAPPINGS = _freeze(ETHNICITY_MAPPINGS)
+TREATMENT_KEYWORDS = _freeze(TREATMENT_KEYWORDS)
+STUDY_KEYWORDS = _freeze(STUDY_KEYWORDS)
+
+# ============================================================================
+# KEYWORD AUTOMATA (Single-Pass Multi-Pattern Matching)
+# ============================================================================
+
+# Text cleaning patterns, compiled once
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')  # Punctuation (keeps word chars and whitespace)
+_NON_WORD_RE = re.compile(r'[^\w]')  # Anything that is not a word character
+
+# ASCII text (nearly all clinical labels and filenames) is lowercased and
+# depunctuated in a single str.translate call; the table is derived from
+# _PUNCTUATION_RE so both paths agree exactly
+_ASCII_CLEAN_TABLE = str.maketrans({
+    chr(i): None if _PUNCTUATION_RE.match(chr(i)) else chr(i).lower()
+    for i in range(128)
+})
+
+
+def _clean_text(text: str) -> str:
+    """Lowercase text and remove punctuation (word chars and whitespace are kept)."""
+    if text.isascii():
+        return text.translate(_ASCII_CLEAN_TABLE)
+    return _PUNCTUATION_RE.sub('', text.lower())
+
+
+# Same idea for stripping every non-word character (case is left alone)
+_ASCII_NON_WORD_TABLE = str.maketrans({
+    chr(i): None for i in range(128) if _NON_WORD_RE.match(chr(i))
+})
+
+
+def _strip_non_word(text: str) -> str:
+    """Remove every character that is not a word character."""
+    if text.isascii():
+        return text.translate(_ASCII_NON_WORD_TABLE)
+    return _NON_WORD_RE.sub('', text)
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed keyword set.
+    
+    WHY: Checking hundreds of keywords with one `in` test each costs
+    O(keywords) per string. The automaton walks the text once and reports
+    every keyword occurrence, so cost depends on text length instead of
+    the size of the vocabulary.
+    
+    Each keyword carries a payload; matching returns the payloads of all
+    keywords found anywhere in the text.
+    """
+    
+    def __init__(self, keywords: List[Tuple[str, any]]):
+        """
+        Build the automaton.
+        
+        Args:
+            keywords: (keyword, payload) pairs; a keyword may appear more than once
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[any]] = [[]]
+        
+        # Build the trie
+        for keyword, payload in keywords:
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(payload)
+        
+        # Breadth-first pass to set failure links and merge outputs
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+        
+        # Fold failure links into a full transition table (a DFA), so scanning
+        # is one dict lookup per character with no fallback loop. BFS order
+        # guarantees a state's failure target is complete before the state.
+        self._delta: List[Dict[str, int]] = [dict(self._goto[0])] + [None] * (len(self._goto) - 1)
+        for state in queue:
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+    
+    def find_all(self, text: str) -> List[any]:
+        """
+        Return payloads of every keyword occurring in text (with repeats).
+        
+        Args:
+            text: Text to scan
+            
+        Returns:
+            List of payloads in order of match end position
+        """
+        delta, out = self._delta, self._out
+        state = 0
+        found = []
+        for char in text:
+            state = delta[state].get(char, 0)
+            if out[state]:
+                found.extend(out[state])
+        return found
+
+
+# Diagnosis: payload is (-len, rank) so min() reproduces longest-match-first,
+# with ties broken by mapping order exactly like the stable sort did.
+# Public so other modules can scan free text against DIAGNOSIS_MAPPING keys.
+DIAGNOSIS_AUTOMATON = KeywordAutomaton([
+    (key, (-len(key), rank)) for rank, key in enumerate(DIAGNOSIS_MAPPING)
+])
+_DIAGNOSIS_BY_RANK = list(DIAGNOSIS_MAPPING.values())
+
+# Modality: modalities are tried in order of their longest pattern (stable),
+# so the winner is the matched modality with the lowest rank in that order
+_MODALITY_ORDER = sorted(
+    MODALITY_PATTERNS, key=lambda m: max(len(p) for p in MODALITY_PATTERNS[m]), reverse=True
+)
+_MODALITY_AUTOMATON = KeywordAutomaton([
+    (pattern, rank)
+    for rank, modality in enumerate(_MODALITY_ORDER)
+    for pattern in MODALITY_PATTERNS[modality]
+])
+
+# Laterality: one longest-first alternation per side, matched only as a whole
+# token (not inside a longer alphanumeric run), so 'os' no longer fires on
+# 'dose' nor 're' on 'retina', while 'exam_r_2024' still reads as right.
+# Bilateral is checked first, then left, then right.
+_LATERALITY_REGEXES = [
+    (side, re.compile(
+        r'(?<![^\W_])(?:'
+        + '|'.join(re.escape(p.lower()) for p in sorted(LATERALITY_PATTERNS[side], key=len, reverse=True))
+        + r')(?![^\W_])'
+    ))
+    for side in ('OU', 'OS', 'OD')
+]
+
+# Clinical findings: payload is the finding's position in CLINICAL_FINDINGS_KEYWORDS
+_FINDING_TYPES = list(CLINICAL_FINDINGS_KEYWORDS)
+_FINDINGS_AUTOMATON = KeywordAutomaton([
+    (keyword, rank)
+    for rank, finding_type in enumerate(_FINDING_TYPES)
+    for keyword in CLINICAL_FINDINGS_KEYWORDS[finding_type]
+])
+
+# Sex: variants cleaned for substring matching, in mapping order
+_SEX_VARIANTS_CLEAN = [
+    (code, _strip_non_word(variant.upper()))
+    for code, variants in SEX_MAPPINGS.items()
+    for variant in variants
+]
+
+# Sex: exact variant -> code; the first code listing a variant wins, as in
+# the mapping-order scan ('unknown' appears under both 'O' and 'U')
+_SEX_EXACT = {
+    variant.upper(): code
+    for code, variants in reversed(SEX_MAPPINGS.items())
+    for variant in variants
+}
+
+# Ethnicity: variants reduced to the same skeleton as the input, for
+# substring matching in mapping order, plus the scan's answer precomputed
+# for every text that is exactly one variant
+
+
+@lru_cache(maxsize=4096)
+def _ethnicity_skeleton(text: str) -> str:
+    """Fold accents and compatibility forms to ASCII, treat hyphens as spaces, then clean."""
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return _clean_text(ascii_text.replace('-', ' '))
+
+
+_ETHNICITY_VARIANTS = [
+    (category, _ethnicity_skeleton(variant))
+    for category, variants in ETHNICITY_MAPPINGS.items()
+    for variant in variants
+]
+_ETHNICITY_REGEXES = [
+    (category, re.compile('|'.join(re.escape(_ethnicity_skeleton(v)) for v in variants)))
+    for category, variants in ETHNICITY_MAPPINGS.items()
+]
+
+
+@lru_cache(maxsize=4096)
+def _scan_ethnicity(eth_clean: str) -> Optional[str]:
+    for category, regex in _ETHNICITY_REGEXES:
+        if regex.search(eth_clean):
+            return category
+    return None
+
+
+_ETHNICITY_EXACT = {
+    variant: _scan_ethnicity(variant)
+    for _, variant in _ETHNICITY_VARIANTS
+}
+
+# Severity: one alternation per keyword tier, most severe first, and the
+# (condition x tier) grade table used by the column-wise path; index -1
+# (unknown condition or no keyword) lands on the trailing None row/column
+_SEVERITY_TIER_REGEXES = [
+    (level, re.compile('|'.join(re.escape(x) for x in keywords)))
+    for level, keywords in SEVERITY_KEYWORD_TIERS
+]
+_SEVERITY_CONDITIONS = pd.Index(list(SEVERITY_GRADING))
+_SEVERITY_GRADE_TABLE = np.full(
+    (len(_SEVERITY_CONDITIONS) + 1, max(level for level, _ in SEVERITY_KEYWORD_TIERS) + 2), None, dtype=object
+)
+for (_condition, _level), _grade in SEVERITY_FLAT.items():
+    _SEVERITY_GRADE_TABLE[_SEVERITY_CONDITIONS.get_loc(_condition), _level] = _grade
+
+
+# Quality, treatment and study keywords: one alternation per category, matched
+# only at the start of a word, so 'clear' no longer fires on 'unclear' nor
+# 'laser' on 'phaser', while plurals such as 'artifacts' still match
+
+
+def _word_start_regexes(table: Dict[str, Tuple[str, ...]]) -> Dict[str, re.Pattern]:
+    return {
+        category: re.compile(
+            r'(?<![a-z0-9])(?:'
+            + '|'.join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+            + ')'
+        )
+        for category, keywords in table.items()
+    }
+
+
+_QUALITY_LEVELS = ('excellent', 'good', 'moderate', 'poor', 'ungradable')
+_QUALITY_REGEXES = _word_start_regexes(IMAGE_QUALITY_KEYWORDS)
+_ARTIFACT_REGEXES = {k: v for k, v in _QUALITY_REGEXES.items() if k not in _QUALITY_LEVELS}
+_TREATMENT_REGEXES = _word_start_regexes(TREATMENT_KEYWORDS)
+_STUDY_REGEXES = _word_start_regexes(STUDY_KEYWORDS)
+
+
+def _matching_categories(regexes: Dict[str, re.Pattern], text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    text_lower = str(text).lower()
+    return [category for category, regex in regexes.items() if regex.search(text_lower)]
+
+
 # ============================================================================
 # HELPER FUNCTIONS FOR COMPREHENSIVE HARMONIZATION
 # ============================================================================
@@ -708,24 +1010,72 @@ def normalize_diagnosis(diagnosis_text: Optional[str]) -> Tuple[Optional[str], O
 
     # STEP 1: Clean and normalize the input text
     # Why? Raw data often has inconsistent formatting, punctuation, case
-    diagnosis_lower = str(diagnosis_text).lower().strip()
-    diagnosis_clean = re.sub(r'[^\w\s]', '', diagnosis_lower)  # Remove punctuation
+    diagnosis_clean = _clean_text(str(diagnosis_text).strip())  # Lowercase, remove punctuation
 
     # STEP 2: Try to match against our comprehensive mapping
     # Strategy: Sort by length (longest first) to match specific terms before general ones
     # Example: "proliferative diabetic retinopathy" should match "proliferative diabetic retinopathy"
     # before just "diabetic retinopathy" or "proliferative"
-    sorted_keys = sorted(DIAGNOSIS_MAPPING.keys(), key=len, reverse=True)
-    for key in sorted_keys:
-        if key in diagnosis_clean:
-            category, severity = DIAGNOSIS_MAPPING[key]
-            return (category, severity)
+    return _diagnosis_for_clean(diagnosis_clean)
+
+
+@lru_cache(maxsize=16384)
+def _diagnosis_for_clean(diagnosis_clean: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Mapping lookup behind normalize_diagnosis(), memoized on the cleaned text.
+    
+    WHY: A few dozen labels ("Normal", "No DR", "mild npdr") account for
+    most rows, and the lookup is a pure function of the cleaned text.
+    """
+    # A text that is exactly a key is its own longest match: one dict probe.
+    # Otherwise one automaton pass finds every key present; min() picks the longest
+    exact = DIAGNOSIS_MAPPING.get(diagnosis_clean)
+    if exact is not None:
+        return exact
+    matches = DIAGNOSIS_AUTOMATON.find_all(diagnosis_clean)
+    if matches:
+        _, rank = min(matches)
+        category, severity = _DIAGNOSIS_BY_RANK[rank]
+        return (category, severity)
 
     # STEP 3: No match found - return None (unknown diagnosis)
     # This preserves data integrity rather than guessing
     return (None, None)
 
 
+def normalize_diagnosis_series(series: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Column-wise version of normalize_diagnosis().
+    
+    Each distinct raw value is normalized once (a single DIAGNOSIS_AUTOMATON
+    scan) and the results are broadcast back to every row through its
+    factorized code.
+    
+    Args:
+        series: Raw diagnosis column (missing values allowed)
+        
+    Returns:
+        Tuple of (diagnosis_category, severity) Series aligned with the input index;
+        categories use DIAGNOSIS_CATEGORY_DTYPE (NaN when unmatched), severities are objects
+    """
+    codes, uniques = pd.factorize(series)
+    
+    # Trailing slot holds (None, None) for missing input (code -1)
+    categories = np.full(len(uniques) + 1, None, dtype=object)
+    severities = np.full(len(uniques) + 1, None, dtype=object)
+    for i, value in enumerate(uniques):
+        categories[i], severities[i] = normalize_diagnosis(str(value))
+    
+    category_codes = DIAGNOSIS_CATEGORY_DTYPE.categories.get_indexer(categories)
+    return (
+        pd.Series(
+            pd.Categorical.from_codes(category_codes[codes], dtype=DIAGNOSIS_CATEGORY_DTYPE),
+            index=series.index,
+        ),
+        pd.Series(severities[codes], index=series.index, dtype=object),
+    )
+
+
 def find_clinical_findings(text: Optional[str]) -> List[str]:
     """
     Detect clinical findings mentioned in diagnosis or notes text.
@@ -742,16 +1092,15 @@ def find_clinical_findings(text: Optional[str]) -> List[str]:
     if not text:
         return []
     
-    text_lower = str(text).lower()
-    findings = []
-    
-    for finding_type, keywords in CLINICAL_FINDINGS_KEYWORDS.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                findings.append(finding_type)
-                break  # Don't count same finding type twice
-    
-    return findings
+    return list(_findings_for_lower(str(text).lower()))
+
+
+@lru_cache(maxsize=4096)
+def _findings_for_lower(text_lower: str) -> Tuple[str, ...]:
+    """Automaton scan behind find_clinical_findings(), memoized on the lowercased text."""
+    # One automaton pass; each finding type is reported once, in mapping order
+    ranks = set(_FINDINGS_AUTOMATON.find_all(text_lower))
+    return tuple(_FINDING_TYPES[rank] for rank in sorted(ranks))
 
 
 def infer_modality(dataset_name: Optional[str], image_description: Optional[str]) -> Optional[str]:
@@ -771,22 +1120,17 @@ def infer_modality(dataset_name: Optional[str], image_description: Optional[str]
     Returns:
         Modality name (exact key from MODALITY_PATTERNS) or None if undetectable
     """
-    combined = f"{dataset_name or ''} {image_description or ''}".lower()
-    combined_clean = re.sub(r'[^\w\s]', '', combined)
-    
-    # Sort by pattern length (longest first) for specificity
-    modality_with_lengths = [
-        (modality, max(len(p) for p in patterns), modality, patterns)
-        for modality, patterns in MODALITY_PATTERNS.items()
-    ]
-    modality_with_lengths.sort(key=lambda x: x[1], reverse=True)
-    
-    # Check patterns in order of specificity
-    for modality, _, _, patterns in modality_with_lengths:
-        sorted_patterns = sorted(patterns, key=len, reverse=True)
-        for pattern in sorted_patterns:
-            if pattern in combined_clean:
-                return modality
+    return _modality_for_clean(_clean_text(f"{dataset_name or ''} {image_description or ''}"))
+
+
+@lru_cache(maxsize=16384)
+def _modality_for_clean(combined_clean: str) -> Optional[str]:
+    """Pattern matching behind infer_modality(), memoized on the cleaned text."""
+    # Modalities are ranked by their longest pattern for specificity;
+    # a single automaton pass reports every modality with a hit
+    matches = _MODALITY_AUTOMATON.find_all(combined_clean)
+    if matches:
+        return _MODALITY_ORDER[min(matches)]
     
     return None
 
@@ -798,6 +1142,9 @@ def infer_laterality(value: any) -> Optional[str]:
     Handles: English (right/left), Latin (OD/OS), French (droit/gauche),
     Spanish (derecha/izquierda), and filename patterns (_r., -l-, _od, -os, etc.)
     
+    Patterns must stand alone as tokens, delimited by the string edges or
+    non-alphanumeric characters (underscores count as delimiters).
+    
     Args:
         value: Laterality descriptor from dataset
         
@@ -807,16 +1154,15 @@ def infer_laterality(value: any) -> Optional[str]:
     if value is None:
         return None
     
-    value_lower = str(value).lower().strip()
-    value_clean = re.sub(r'[^\w\s]', '', value_lower)
-    
-    # Check patterns (exact matches prioritized, then longest substrings)
-    for standard, patterns in LATERALITY_PATTERNS.items():
-        sorted_patterns = sorted(patterns, key=len, reverse=True)
-        for pattern in sorted_patterns:
-            pattern_clean = re.sub(r'[^\w\s]', '', pattern.lower())
-            if pattern_clean == value_clean or (len(pattern_clean) > 1 and pattern_clean in value_clean):
-                return standard
+    return _laterality_for_lower(str(value).lower())
+
+
+@lru_cache(maxsize=16384)
+def _laterality_for_lower(value_lower: str) -> Optional[str]:
+    """Pattern matching behind infer_laterality(), memoized on the lowercased value."""
+    for side, pattern in _LATERALITY_REGEXES:
+        if pattern.search(value_lower):
+            return side
     
     return None
 
@@ -842,23 +1188,44 @@ def infer_severity_from_diagnosis(diagnosis_text: str, diagnosed_condition: str)
         return None
     
     diagnosis_lower = str(diagnosis_text).lower()
-    condition_grades = SEVERITY_GRADING[diagnosed_condition]
     
     # Progressive severity keywords (check most specific first)
-    if any(x in diagnosis_lower for x in ['proliferative', 'terminal', 'hypermature', 'advanced']):
-        return condition_grades.get(4, None)
-    elif any(x in diagnosis_lower for x in ['severe', 'advanced', 'significant', 'substantial']):
-        return condition_grades.get(3, None)
-    elif any(x in diagnosis_lower for x in ['moderate', 'intermediate', 'medium']):
-        return condition_grades.get(2, None)
-    elif any(x in diagnosis_lower for x in ['mild', 'minimal', 'early', 'slight']):
-        return condition_grades.get(1, None)
-    elif any(x in diagnosis_lower for x in ['no ', 'without', 'negative', 'absent', 'none']):
-        return condition_grades.get(0, None)
+    for level, regex in _SEVERITY_TIER_REGEXES:
+        if regex.search(diagnosis_lower):
+            return SEVERITY_FLAT.get((diagnosed_condition, level))
     
     return None
 
 
+def infer_severity_series(diagnosis_text: pd.Series, diagnosed_condition: pd.Series) -> pd.Series:
+    """
+    Column-wise version of infer_severity_from_diagnosis().
+    
+    Severity becomes integer arithmetic: each text gets an int8 tier code
+    from the keyword masks, each condition an int8 code into SEVERITY_GRADING,
+    and the grade name is a single lookup in a (condition x tier) table.
+    Missing text behaves like None does in the scalar function.
+    
+    Args:
+        diagnosis_text: Original diagnosis text column
+        diagnosed_condition: Standardized diagnosis category column
+        
+    Returns:
+        Object Series of severity levels (None where not determinable)
+    """
+    text_lower = diagnosis_text.astype(object).where(diagnosis_text.notna(), 'None').astype(str).str.lower()
+    
+    masks = [
+        text_lower.str.contains(regex).to_numpy(dtype=bool)
+        for _, regex in _SEVERITY_TIER_REGEXES
+    ]
+    levels = [level for level, _ in _SEVERITY_TIER_REGEXES]
+    tier_codes = np.select(masks, levels, default=-1).astype(np.int8)
+    condition_codes = _SEVERITY_CONDITIONS.get_indexer(diagnosed_condition).astype(np.int8)
+    
+    return pd.Series(_SEVERITY_GRADE_TABLE[condition_codes, tier_codes], index=diagnosis_text.index, dtype=object)
+
+
 def assess_image_quality(quality_text: Optional[str], has_artifacts: bool = False) -> Optional[str]:
     """
     Assess and standardize image quality from text descriptions.
@@ -876,17 +1243,21 @@ def assess_image_quality(quality_text: Optional[str], has_artifacts: bool = Fals
     if not quality_text:
         return 'Ungradable' if has_artifacts else None
     
-    quality_lower = str(quality_text).lower()
-    
-    if any(x in quality_lower for x in IMAGE_QUALITY_KEYWORDS['excellent']):
+    return _quality_for_lower(str(quality_text).lower(), bool(has_artifacts))
+
+
+@lru_cache(maxsize=4096)
+def _quality_for_lower(quality_lower: str, has_artifacts: bool) -> Optional[str]:
+    """Tiered matching behind assess_image_quality(), memoized on the lowercased text."""
+    if _QUALITY_REGEXES['excellent'].search(quality_lower):
         return 'Excellent'
-    elif any(x in quality_lower for x in IMAGE_QUALITY_KEYWORDS['good']):
+    elif _QUALITY_REGEXES['good'].search(quality_lower):
         return 'Good'
-    elif any(x in quality_lower for x in IMAGE_QUALITY_KEYWORDS['moderate']):
+    elif _QUALITY_REGEXES['moderate'].search(quality_lower):
         return 'Moderate'
-    elif any(x in quality_lower for x in IMAGE_QUALITY_KEYWORDS['poor']) or has_artifacts:
+    elif _QUALITY_REGEXES['poor'].search(quality_lower) or has_artifacts:
         return 'Poor'
-    elif any(x in quality_lower for x in IMAGE_QUALITY_KEYWORDS['ungradable']):
+    elif _QUALITY_REGEXES['ungradable'].search(quality_lower):
         return 'Ungradable'
     
     return None
@@ -907,18 +1278,39 @@ def detect_artifacts(quality_text: Optional[str]) -> List[str]:
     """
     if not quality_text:
         return []
+    return list(_artifacts_for_lower(str(quality_text).lower()))
+
+
+@lru_cache(maxsize=4096)
+def _artifacts_for_lower(text_lower: str) -> Tuple[str, ...]:
+    """Artifact matching behind detect_artifacts(), memoized on the lowercased text."""
+    return tuple(_matching_categories(_ARTIFACT_REGEXES, text_lower))
+
+
+def detect_treatments(text: Optional[str]) -> List[str]:
+    """
+    Detect treatment categories mentioned in free text.
     
-    text_lower = str(quality_text).lower()
-    artifacts = []
-    
-    for artifact_type, keywords in IMAGE_QUALITY_KEYWORDS.items():
-        if 'artifact' not in artifact_type:  # Skip quality levels
-            for keyword in keywords:
-                if keyword in text_lower:
-                    artifacts.append(artifact_type)
-                    break
+    Args:
+        text: Treatment or notes text
+        
+    Returns:
+        List of TREATMENT_KEYWORDS categories, in table order
+    """
+    return _matching_categories(_TREATMENT_REGEXES, text)
+
+
+def detect_study_timepoints(text: Optional[str]) -> List[str]:
+    """
+    Detect study timepoints (baseline, follow-up, endpoint) in free text.
     
-    return artifacts
+    Args:
+        text: Visit or study phase text
+        
+    Returns:
+        List of STUDY_KEYWORDS categories, in table order
+    """
+    return _matching_categories(_STUDY_REGEXES, text)
 
 
 def standardize_age(age_input: any) -> Optional[int]:
@@ -947,6 +1339,28 @@ def standardize_age(age_input: any) -> Optional[int]:
         return None
 
 
+def bucket_age(ages) -> np.ndarray:
+    """
+    Classify ages into AGE_RANGES bands in bulk.
+    
+    Bands are half-open [low, high) and contiguous, so the band for every
+    age is found with one vectorized binary search over the band edges.
+    
+    Args:
+        ages: Array-like of ages in years (missing values allowed)
+        
+    Returns:
+        Object array of band names ('infant' ... 'elderly'), None for missing
+        or out-of-range ages
+    """
+    ages = pd.to_numeric(pd.Series(ages, dtype=object), errors='coerce').to_numpy(dtype=float)
+    
+    band_idx = np.searchsorted(_AGE_EDGES, ages, side='right') - 1
+    in_range = (ages >= _AGE_EDGES[0]) & (ages < _AGE_EDGES[-1])  # NaN compares False
+    
+    return np.where(in_range, _AGE_LABELS[np.clip(band_idx, 0, len(_AGE_LABELS) - 1)], None)
+
+
 def standardize_sex(sex_input: any) -> Optional[str]:
     """
     Standardize patient sex/gender to single character code.
@@ -966,16 +1380,21 @@ def standardize_sex(sex_input: any) -> Optional[str]:
     val_upper = str(sex_input).upper().strip()
     
     # Check exact matches
-    for code, variants in SEX_MAPPINGS.items():
-        if any(variant.upper() == val_upper for variant in variants):
-            return code
+    code = _SEX_EXACT.get(val_upper)
+    if code is not None:
+        return code
     
     # Check substring matches
-    val_upper_clean = re.sub(r'[^\w]', '', val_upper)
-    for code, variants in SEX_MAPPINGS.items():
-        for variant in variants:
-            if re.sub(r'[^\w]', '', variant.upper()) in val_upper_clean:
-                return code
+    return _sex_substring_match(val_upper)
+
+
+@lru_cache(maxsize=4096)
+def _sex_substring_match(val_upper: str) -> Optional[str]:
+    """Substring fallback behind standardize_sex(), memoized on the uppercased value."""
+    val_upper_clean = _strip_non_word(val_upper)
+    for code, variant_clean in _SEX_VARIANTS_CLEAN:
+        if variant_clean in val_upper_clean:
+            return code
     
     return None
 
@@ -986,6 +1405,7 @@ def standardize_ethnicity(ethnicity_input: any) -> Optional[str]:
     
     Maps various ethnicity descriptors to: Caucasian, African, Asian,
     Hispanic, Middle Eastern, Pacific Islander, Mixed, or Other.
+    Accents, compatibility forms and hyphens are folded before matching.
     
     Args:
         ethnicity_input: Ethnicity descriptor
@@ -996,15 +1416,12 @@ def standardize_ethnicity(ethnicity_input: any) -> Optional[str]:
     if not ethnicity_input:
         return None
     
-    eth_lower = str(ethnicity_input).lower()
-    eth_clean = re.sub(r'[^\w\s]', '', eth_lower)
+    eth_clean = _ethnicity_skeleton(str(ethnicity_input))
     
-    for category, variants in ETHNICITY_MAPPINGS.items():
-        for variant in variants:
-            if variant.lower() in eth_clean:
-                return category
+    if eth_clean in _ETHNICITY_EXACT:
+        return _ETHNICITY_EXACT[eth_clean]
     
-    return None
+    return _scan_ethnicity(eth_clean)
 
 
 def detect_column_role(column_name: str) -> Optional[str]:
@@ -1020,8 +1437,17 @@ def detect_column_role(column_name: str) -> Optional[str]:
     Returns:
         Field name (e.g., 'diagnosis', 'modality', 'laterality') or None
     """
-    col_lower = column_name.lower()
+    return _role_for_name(column_name.lower())
+
+
+@lru_cache(maxsize=4096)
+def _role_for_name(col_lower: str) -> Optional[str]:
+    """
+    Keyword detection behind detect_column_role(), memoized on the lowercased name.
     
+    WHY: The same column names ("diagnosis", "label", "eye") recur across
+    datasets, and detection is a pure function of the name.
+    """
     # Priority-ordered detection
     if any(x in col_lower for x in ['diagnosis', 'label', 'class', 'disease', 'condition']):
         return 'diagnosis'
@@ -1078,3 +1504,53 @@ def harmonize_column_value(field_type: str, value: any, context: Dict = None) ->
         return standardize_ethnicity(value)
     
     return value
+
+
+def harmonize_column_series(field_type: str, series: pd.Series, context: Dict = None) -> pd.Series:
+    """
+    Apply field-specific harmonization to a whole column at once.
+    
+    Each distinct raw value is harmonized a single time with
+    harmonize_column_value() and the result is broadcast back to every row
+    through its factorized code, so per-row work is an array take instead
+    of a Python call. Values are passed as strings (missing values as None),
+    matching what the row-wise loader path sees.
+    
+    Args:
+        field_type: Type of field being harmonized
+        series: Raw column values
+        context: Optional context dict with dataset_name, etc.
+        
+    Returns:
+        Object Series of harmonized values aligned with the input index
+    """
+    if field_type == 'patient_age' and pd.api.types.is_numeric_dtype(series) \
+            and not pd.api.types.is_bool_dtype(series):
+        return _standardize_age_numeric(series)
+    
+    codes, uniques = pd.factorize(series)
+    
+    harmonized = np.empty(len(uniques) + 1, dtype=object)
+    for i, value in enumerate(uniques):
+        harmonized[i] = harmonize_column_value(field_type, str(value), context)
+    # Missing values get code -1, which takes the trailing slot
+    harmonized[-1] = harmonize_column_value(field_type, None, context)
+    
+    return pd.Series(harmonized[codes], index=series.index, dtype=object)
+
+
+def _standardize_age_numeric(series: pd.Series) -> pd.Series:
+    """
+    standardize_age() for an already-numeric column, as array arithmetic.
+    
+    WHY: Ages are often continuous (e.g. 54.3, 61.7), so nearly every value
+    is distinct and factorizing saves nothing. Truncation toward zero and
+    the 0-150 range check match the scalar function; NaN and infinities
+    become None.
+    """
+    ages = np.trunc(series.to_numpy(dtype=float, na_value=np.nan))
+    valid = (ages >= 0) & (ages <= 150)
+    
+    standardized = np.full(len(ages), None, dtype=object)
+    standardized[valid] = ages[valid].astype(np.int64).tolist()
+    return pd.Series(standardized, index=series.index, dtype=object)
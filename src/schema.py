@@ -637,6 +637,18 @@ def create_schema_columns() -> List[str]:
     ]
 
 
+# Canonical columns with small, fixed vocabularies; stored as pandas categoricals
+# (integer codes + one shared dictionary) instead of per-row Python strings
+CATEGORICAL_COLUMNS = [
+    'dataset_source',
+    'modality',
+    'laterality',
+    'view_type',
+    'diagnosis_category',
+    'severity',
+]
+
+
 def get_enum_values(enum_class) -> List[str]:
     """Get all values from an Enum class."""
     return [item.value for item in enum_class]
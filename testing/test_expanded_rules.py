@@ -3,21 +3,31 @@ Comprehensive test suite for expanded harmonization ruleset.
 Tests all 15+ new functions and enhanced patterns across 269+ diagnosis keywords.
 """
 
+import pandas as pd
 import pytest
 from src.rules import (
     normalize_diagnosis,
+    normalize_diagnosis_series,
     find_clinical_findings,
     infer_modality,
     infer_laterality,
     infer_severity_from_diagnosis,
+    infer_severity_series,
     assess_image_quality,
     detect_artifacts,
+    detect_treatments,
+    detect_study_timepoints,
     standardize_age,
+    bucket_age,
     standardize_sex,
     standardize_ethnicity,
     detect_column_role,
     harmonize_column_value,
+    harmonize_column_series,
+    KeywordAutomaton,
+    DIAGNOSIS_AUTOMATON,
     DIAGNOSIS_MAPPING,
+    DIAGNOSIS_CATEGORY_DTYPE,
     CLINICAL_FINDINGS_KEYWORDS,
     MODALITY_PATTERNS,
     LATERALITY_PATTERNS,
@@ -84,6 +94,31 @@ class TestDiagnosisNormalization:
         assert normalize_diagnosis('healthy')[0] == 'Normal'
 
 
+class TestDiagnosisNormalizationSeries:
+    """Test column-wise diagnosis normalization matches the scalar path"""
+    
+    def test_matches_scalar_normalization(self):
+        values = ['Mild NPDR', 'wet amd', 'no dr', 'glaucoma suspect', 'unknown', '', None]
+        categories, severities = normalize_diagnosis_series(pd.Series(values))
+        for value, category, severity in zip(values, categories, severities):
+            assert normalize_diagnosis(value) == (None if pd.isna(category) else category, severity)
+    
+    def test_categories_use_fixed_dtype(self):
+        categories, _ = normalize_diagnosis_series(pd.Series(['pdr', 'no dr', None]))
+        assert categories.dtype == DIAGNOSIS_CATEGORY_DTYPE
+        assert categories.tolist()[:2] == ['Diabetic Retinopathy', 'Normal']
+    
+    def test_preserves_index(self):
+        categories, severities = normalize_diagnosis_series(pd.Series(['pdr'], index=[7]))
+        assert list(categories.index) == [7]
+        assert list(severities.index) == [7]
+    
+    def test_all_missing(self):
+        categories, severities = normalize_diagnosis_series(pd.Series([None, None]))
+        assert categories.isna().all()
+        assert severities.isna().all()
+
+
 class TestClinicalFindings:
     """Test clinical findings detection"""
     
@@ -110,6 +145,17 @@ class TestClinicalFindings:
     def test_multiple_findings(self):
         findings = find_clinical_findings('Hemorrhage, exudates, and edema visible')
         assert len(findings) >= 2
+    
+    def test_findings_unique_and_in_mapping_order(self):
+        findings = find_clinical_findings('lipid lipid exudate hemorrhage')
+        assert len(findings) == len(set(findings))
+        order = list(CLINICAL_FINDINGS_KEYWORDS)
+        assert findings == sorted(findings, key=order.index)
+    
+    def test_repeated_calls_return_fresh_lists(self):
+        findings = find_clinical_findings('retinal hemorrhage')
+        findings.append('tampered')
+        assert 'tampered' not in find_clinical_findings('retinal hemorrhage')
 
 
 class TestModalityInference:
@@ -168,6 +214,11 @@ class TestLateralityInference:
     def test_filename_patterns(self):
         assert infer_laterality('exam_r_2024') == 'OD'
         assert infer_laterality('scan-l-final') == 'OS'
+    
+    def test_no_match_inside_words(self):
+        assert infer_laterality('dose') is None
+        assert infer_laterality('retina') is None
+        assert infer_laterality('laser') is None
 
 
 class TestSeverityInference:
@@ -190,6 +241,21 @@ class TestSeverityInference:
         assert sev == 'Mild'
 
 
+class TestSeverityInferenceSeries:
+    """Test column-wise severity grading matches the scalar path"""
+    
+    def test_matches_scalar_inference(self):
+        texts = ['proliferative dr', 'mild changes', 'no disease', 'severe', None, 'unremarkable']
+        conditions = ['diabetic retinopathy', 'diabetic retinopathy', 'amd', 'Unknown', 'amd', 'amd']
+        result = infer_severity_series(pd.Series(texts), pd.Series(conditions))
+        expected = [infer_severity_from_diagnosis(t, c) for t, c in zip(texts, conditions)]
+        assert result.tolist() == expected
+    
+    def test_grade_lookup(self):
+        result = infer_severity_series(pd.Series(['moderate npdr']), pd.Series(['diabetic retinopathy']))
+        assert result.tolist() == ['Moderate']
+
+
 class TestImageQuality:
     """Test image quality assessment"""
     
@@ -212,6 +278,25 @@ class TestImageQuality:
         artifacts = detect_artifacts('Motion blur and media opacity present')
         assert len(artifacts) > 0
 
+    def test_keywords_match_at_word_start(self):
+        assert assess_image_quality('Unclear, low quality') == 'Poor'
+        assert detect_artifacts('several artifacts') == ['artifact_present']
+        assert detect_artifacts('Poor, dark image') == ['inadequate_illumination']
+        assert detect_artifacts('no issues') == []
+
+
+class TestTreatmentAndStudyDetection:
+    """Test treatment and study timepoint keyword detection"""
+    
+    def test_treatments(self):
+        assert detect_treatments('Intravitreal anti-VEGF after laser') == ['laser', 'injection']
+        assert detect_treatments('phaser') == []
+        assert detect_treatments(None) == []
+    
+    def test_study_timepoints(self):
+        assert detect_study_timepoints('Baseline visit') == ['baseline', 'followup']
+        assert detect_study_timepoints('Follow-up, month 6') == ['followup']
+
 
 class TestDemographicStandardization:
     """Test patient demographic standardization"""
@@ -244,6 +329,33 @@ class TestDemographicStandardization:
         assert standardize_ethnicity('Hispanic') == 'Hispanic'
         assert standardize_ethnicity(None) is None
 
+    def test_ethnicity_first_category_wins(self):
+        # Exact and free-text inputs resolve by the same mapping-order scan
+        assert standardize_ethnicity('african american') == 'African'
+        assert standardize_ethnicity('Spanish / Latino') == 'Hispanic'
+        assert standardize_ethnicity('asian indian') == 'Asian'
+        assert standardize_ethnicity('prefer not to say') == 'Other'
+
+    def test_ethnicity_folds_accents_and_hyphens(self):
+        assert standardize_ethnicity('Latíno') == 'Hispanic'
+        assert standardize_ethnicity('Afro Caribbean') == 'African'
+        assert standardize_ethnicity('Ｍｉｘｅｄ') == 'Mixed'
+        assert standardize_ethnicity('AFRO-CARIBBEAN') == 'African'
+
+
+class TestAgeBuckets:
+    """Test vectorized AGE_RANGES classification"""
+    
+    def test_band_edges(self):
+        result = bucket_age([0, 1.9, 2, 12, 13, 17, 18, 64, 65, 149])
+        assert result.tolist() == [
+            'infant', 'infant', 'toddler', 'child', 'adolescent',
+            'adolescent', 'adult', 'adult', 'elderly', 'elderly',
+        ]
+    
+    def test_missing_and_out_of_range(self):
+        assert bucket_age([None, float('nan'), -1, 150, 'abc']).tolist() == [None] * 5
+
 
 class TestColumnRoleDetection:
     """Test auto-detection of column purposes"""
@@ -269,6 +381,10 @@ class TestColumnRoleDetection:
     def test_sex_detection(self):
         assert detect_column_role('sex') == 'patient_sex'
         assert detect_column_role('gender') == 'patient_sex'
+    
+    def test_detection_is_case_insensitive(self):
+        # Differently-cased names share one cached detection
+        assert detect_column_role('Diagnosis') == detect_column_role('DIAGNOSIS') == 'diagnosis'
 
 
 class TestHarmonizeColumnValue:
@@ -299,6 +415,63 @@ class TestHarmonizeColumnValue:
         assert result == 'F'
 
 
+class TestHarmonizeColumnSeries:
+    """Test column-wise harmonization matches the scalar path"""
+    
+    def test_matches_scalar_harmonization(self):
+        series = pd.Series(['right', 'left', 'right', None, 'both'])
+        result = harmonize_column_series('laterality', series)
+        expected = [harmonize_column_value('laterality', None if v is None else str(v)) for v in series]
+        assert result.tolist() == expected
+    
+    def test_numeric_column(self):
+        series = pd.Series([42.5, None, 70.0])
+        result = harmonize_column_series('patient_age', series)
+        assert result.tolist() == [42, None, 70]
+    
+    def test_numeric_age_range_and_infinities(self):
+        series = pd.Series([150.9, 151, -0.5, -1, float('inf')], dtype=float)
+        result = harmonize_column_series('patient_age', series)
+        assert result.tolist() == [150, None, 0, None, None]
+    
+    def test_preserves_index(self):
+        series = pd.Series(['Female', 'M'], index=[10, 20])
+        result = harmonize_column_series('patient_sex', series)
+        assert list(result.index) == [10, 20]
+        assert result.tolist() == ['F', 'M']
+    
+    def test_context_used_for_missing_values(self):
+        series = pd.Series([None, None])
+        result = harmonize_column_series('modality', series, {'dataset_name': 'Messidor'})
+        assert result.tolist() == ['Fundus', 'Fundus']
+
+
+class TestKeywordAutomaton:
+    """Test the multi-pattern matcher behind the inference functions"""
+    
+    def test_finds_overlapping_keywords(self):
+        automaton = KeywordAutomaton([('he', 1), ('she', 2), ('hers', 3), ('his', 4)])
+        assert sorted(automaton.find_all('ushers')) == [1, 2, 3]
+    
+    def test_no_match(self):
+        automaton = KeywordAutomaton([('oct', 'OCT')])
+        assert automaton.find_all('fundus photo') == []
+    
+    def test_repeated_keyword_payloads(self):
+        automaton = KeywordAutomaton([('angiography', 'OCTA'), ('angiography', 'FA')])
+        assert automaton.find_all('angiography') == ['OCTA', 'FA']
+    
+    def test_diagnosis_automaton_payloads(self):
+        # Payloads are (-key length, mapping rank)
+        matches = DIAGNOSIS_AUTOMATON.find_all('diabetic retinopathy')
+        assert (-len('diabetic retinopathy'), list(DIAGNOSIS_MAPPING).index('diabetic retinopathy')) in matches
+    
+    def test_longest_diagnosis_key_wins(self):
+        # 'proliferative diabetic retinopathy' must beat the shorter keys it contains
+        assert normalize_diagnosis('proliferative diabetic retinopathy') == \
+            DIAGNOSIS_MAPPING['proliferative diabetic retinopathy']
+
+
 class TestComponentCounts:
     """Verify expanded component counts"""
     
@@ -313,6 +486,11 @@ class TestComponentCounts:
     
     def test_laterality_patterns_size(self):
         assert len(LATERALITY_PATTERNS) == 3  # OD, OS, OU
+    
+    def test_patterns_have_no_duplicates(self):
+        for table in (LATERALITY_PATTERNS, MODALITY_PATTERNS, CLINICAL_FINDINGS_KEYWORDS):
+            for patterns in table.values():
+                assert len(patterns) == len(set(patterns))
 
 
 if __name__ == '__main__':
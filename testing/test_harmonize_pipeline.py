@@ -0,0 +1,117 @@
+"""
+Test suite for the multi-dataset HarmonizationPipeline.
+Covers sequential vs parallel harmonization and the streaming exports.
+"""
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+# The pipeline package lives in the DATA-PROCESSING tree only
+harmonize_all = pytest.importorskip('src.pipeline.harmonize_all')
+HarmonizationPipeline = harmonize_all.HarmonizationPipeline
+
+
+# Loader functions are module-level so worker processes can unpickle them
+def load_messidor():
+    return pd.DataFrame({
+        'image_id': ['m1', 'm2', 'm3'],
+        'diagnosis': ['mild npdr', 'Normal', 'severe npdr'],
+        'eye': ['right', 'left', 'os'],
+    })
+
+
+def load_octdl():
+    return pd.DataFrame({'image_id': ['o1', 'o2'], 'diagnosis': ['wet amd', 'glaucoma']})
+
+
+def load_empty():
+    return pd.DataFrame({'image_id': [], 'diagnosis': []})
+
+
+def load_missing():
+    raise IOError('missing file')
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    pipeline = HarmonizationPipeline(str(tmp_path))
+    pipeline.register_dataset('Messidor', load_messidor)
+    pipeline.register_dataset('OCTDL', load_octdl)
+    pipeline.register_dataset('Empty', load_empty)
+    pipeline.register_dataset('Missing', load_missing)
+    pipeline.register_dataset('Disabled', load_messidor, enabled=False)
+    return pipeline
+
+
+def without_timestamps(df):
+    return df.drop(columns='created_at')
+
+
+class TestHarmonizeAll:
+    """Test dataset harmonization and merging"""
+
+    def test_failed_empty_and_disabled_datasets_are_skipped(self, pipeline):
+        merged = pipeline.harmonize_all()
+        assert len(merged) == 5
+        assert set(merged['dataset_source']) == {'Messidor', 'OCTDL'}
+        assert 'Missing' not in pipeline.harmonized_dfs
+        assert 'Disabled' not in pipeline.harmonized_dfs
+
+    def test_parallel_matches_sequential(self, pipeline, tmp_path):
+        sequential = pipeline.harmonize_all(max_workers=1)
+
+        parallel_pipeline = HarmonizationPipeline(str(tmp_path / 'parallel'))
+        parallel_pipeline.datasets_registry = dict(pipeline.datasets_registry)
+        parallel = parallel_pipeline.harmonize_all(max_workers=2)
+
+        pd.testing.assert_frame_equal(without_timestamps(parallel), without_timestamps(sequential))
+        assert isinstance(parallel['diagnosis_category'].dtype, pd.CategoricalDtype)
+        assert parallel_pipeline.load_reports.keys() == pipeline.load_reports.keys()
+
+    def test_statistics(self, pipeline):
+        pipeline.harmonize_all()
+        stats = pipeline.get_statistics()
+        assert stats['total_records'] == 5
+        assert stats['unique_diagnoses'] == 4
+
+
+class TestExports:
+    """Test that every export path writes the same records"""
+
+    def test_streamed_parquet_matches_export(self, pipeline):
+        pipeline.harmonize_all()
+        exported = pipeline.export_to_parquet('exported.parquet')
+        streamed = pipeline.stream_to_parquet('streamed.parquet')
+
+        assert pq.read_metadata(streamed).num_rows == 5
+        assert pq.read_schema(streamed).remove_metadata() == pq.read_schema(exported).remove_metadata()
+        pd.testing.assert_frame_equal(
+            without_timestamps(pd.read_parquet(streamed)),
+            without_timestamps(pd.read_parquet(exported)),
+        )
+
+    def test_pruned_parquet_keeps_field_types(self, pipeline):
+        pipeline.harmonize_all()
+        full = pq.read_schema(pipeline.export_to_parquet('full.parquet'))
+        pruned = pq.read_schema(pipeline.export_to_parquet('pruned.parquet', columns=['image_id', 'severity']))
+        assert pruned.names == ['image_id', 'severity']
+        assert pruned.field('severity').type == full.field('severity').type
+
+    def test_streamed_csv_matches_export(self, pipeline):
+        pipeline.harmonize_all()
+        exported = pd.read_csv(pipeline.export_to_csv('exported.csv'))
+        streamed = pd.read_csv(pipeline.stream_to_csv('streamed.csv'))
+
+        assert len(streamed) == 5
+        pd.testing.assert_frame_equal(without_timestamps(streamed), without_timestamps(exported))
+
+    def test_streaming_with_nothing_to_write(self, tmp_path):
+        pipeline = HarmonizationPipeline(str(tmp_path))
+        pipeline.register_dataset('Missing', load_missing)
+        assert pq.read_metadata(pipeline.stream_to_parquet()).num_rows == 0
+        assert list(pd.read_csv(pipeline.stream_to_csv()).index) == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
@@ -0,0 +1,77 @@
+"""
+Test suite for the Retinal Alzheimer's loader.
+Covers the bulk harmonization path and its handling of missing values.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The dataset-specific loaders live in the top-level src/loaders tree only
+LOADER_PATH = Path(__file__).resolve().parents[1] / 'src' / 'loaders' / 'retinal_alzheimers_loader.py'
+_spec = importlib.util.spec_from_file_location('retinal_alzheimers_loader', LOADER_PATH)
+retinal_alzheimers_loader = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(retinal_alzheimers_loader)
+RetinalAlzheimersLoader = retinal_alzheimers_loader.RetinalAlzheimersLoader
+
+IMAGE_FILES = {
+    'alzheimers': ['p1_OD_alzheimers_18.tiff', 'p2_OS_alzheimers_x.png'],
+    'mci': ['p3_OU_mci_26.png'],
+    'controls': ['p4_XX_controls_29.jpg', 'p5_OD_controls_30.jpeg'],
+}
+
+
+@pytest.fixture
+def alz_dir(tmp_path):
+    for diagnosis, names in IMAGE_FILES.items():
+        (tmp_path / diagnosis).mkdir()
+        for name in names:
+            (tmp_path / diagnosis / name).write_bytes(b'\0' * 8)
+    return tmp_path
+
+
+def assert_matches_per_record_path(loader, df):
+    expected = [loader.harmonize_alzheimers_record(record) for record in df.to_dict('records')]
+    assert loader.harmonize_alzheimers_df(df) == expected
+
+
+class TestHarmonizeAlzheimersDataFrame:
+    """Test that the bulk path matches harmonize_alzheimers_record()"""
+
+    def test_without_clinical_data(self, alz_dir):
+        # No age/gender columns at all; 'x' leaves an Int64 <NA> score
+        loader = RetinalAlzheimersLoader('RetinalAlzheimers', str(alz_dir))
+        df = loader.load_raw_data()
+        assert 'age' not in df.columns and 'gender' not in df.columns
+        assert df['cognitive_score'].dtype == 'Int64' and df['cognitive_score'].isna().any()
+        assert_matches_per_record_path(loader, df)
+
+    def test_with_clinical_data(self, alz_dir):
+        # Gender codes are mapped, unknown values pass through, gaps are omitted
+        pd.DataFrame({
+            'patient_id': ['p1', 'ALZ_p2', 'p3', 'p4'],
+            'age': [71, None, 64.0, 80],
+            'gender': ['M', 'F', None, 'Nonbinary'],
+        }).to_csv(alz_dir / 'clinical_data.csv', index=False)
+        loader = RetinalAlzheimersLoader('RetinalAlzheimers', str(alz_dir))
+        df = loader.load_raw_data()
+        assert_matches_per_record_path(loader, df)
+
+        records = {r['record_id']: r for r in loader.harmonize_alzheimers_df(df)}
+        assert records['ALZ_p1_OD_alzheimers_18']['demographics'] == {'age': 71, 'gender': 'Male'}
+        assert records['ALZ_p2_OS_alzheimers_x']['demographics'] == {'gender': 'Female'}
+        assert records['ALZ_p2_OS_alzheimers_x']['clinical_findings'] == {}
+        assert records['ALZ_p3_OU_mci_26']['demographics'] == {'age': 64}
+        assert records['ALZ_p4_XX_controls_29']['demographics']['gender'] == 'Nonbinary'
+        assert records['ALZ_p4_XX_controls_29']['laterality'] == 'Unknown'
+        assert 'demographics' not in records['ALZ_p5_OD_controls_30']
+
+    def test_empty_frame(self, alz_dir):
+        loader = RetinalAlzheimersLoader('RetinalAlzheimers', str(alz_dir))
+        assert loader.harmonize_alzheimers_df(loader.load_raw_data().iloc[:0]) == []
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
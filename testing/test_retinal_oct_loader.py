@@ -0,0 +1,100 @@
+"""
+Test suite for the Retinal OCT loader.
+Covers the slice frame built by load_raw_data() and the bulk harmonization path.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# The dataset-specific loaders live in the top-level src/loaders tree only
+LOADER_PATH = Path(__file__).resolve().parents[1] / 'src' / 'loaders' / 'retinal_oct_loader.py'
+_spec = importlib.util.spec_from_file_location('retinal_oct_loader', LOADER_PATH)
+retinal_oct_loader = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(retinal_oct_loader)
+RetinalOCTLoader = retinal_oct_loader.RetinalOCTLoader
+
+SLICE_FILES = {
+    'CNV': ['CNV_001_1', 'CNV_001_2', 'CNV_001_3', 'CNV_004_1'],
+    'DME': ['DME_002_2', 'DME_002_10'],
+    'NORMAL': ['NORMAL_003_1'],
+}
+
+
+@pytest.fixture
+def oct_dir(tmp_path):
+    for class_name, stems in SLICE_FILES.items():
+        (tmp_path / class_name).mkdir()
+        for stem in stems:
+            (tmp_path / class_name / f'{stem}.tiff').write_bytes(b'\0' * 16)
+    return tmp_path
+
+
+@pytest.fixture
+def loader(oct_dir):
+    return RetinalOCTLoader('RetinalOCT', str(oct_dir))
+
+
+class TestHarmonizeOCTDataFrame:
+    """Test that the bulk path matches harmonize_oct_record()"""
+
+    def test_slice_frame_uses_compact_dtypes(self, loader):
+        df = loader.load_raw_data()
+        assert len(df) == 7
+        assert isinstance(df['diagnosis_class'].dtype, pd.CategoricalDtype)
+        assert df['slice_number'].dtype == 'uint16'
+        assert df['wavelength'].dtype == 'uint16'
+
+    def test_matches_per_record_path(self, loader):
+        df = loader.load_raw_data()
+        expected = [loader.harmonize_oct_record(record) for record in df.to_dict('records')]
+        assert loader.harmonize_oct_dataframe(df) == expected
+
+    def test_unknown_class_maps_to_other(self, loader):
+        df = loader.load_raw_data()
+        df['diagnosis_class'] = df['diagnosis_class'].astype(object)
+        df.loc[0, 'diagnosis_class'] = 'UNKNOWN'
+        expected = [loader.harmonize_oct_record(record) for record in df.to_dict('records')]
+        records = loader.harmonize_oct_dataframe(df)
+        assert records == expected
+        assert records[0]['diagnosis_category'] == 'Other'
+
+    def test_empty_frame(self, loader):
+        assert loader.harmonize_oct_dataframe(loader.load_raw_data().iloc[:0]) == []
+
+
+class TestSplitVolumeTables:
+    """Test the volume/slice table split"""
+
+    def test_volumes_are_keyed_on_class_and_id(self, loader, oct_dir):
+        # The same volume id in a second class folder is a separate volume
+        (oct_dir / 'DME' / 'CNV_001_1.tiff').write_bytes(b'\0' * 16)
+        df = loader.load_raw_data()
+        volumes, slices = loader.split_volume_tables(df)
+
+        key = retinal_oct_loader.VOLUME_KEY
+        assert len(volumes) == 5
+        assert not volumes.duplicated(key).any()
+        assert set(key) <= set(slices.columns)
+
+        joined = slices.merge(volumes, on=key, validate='many_to_one')
+        assert len(joined) == len(df)
+        assert joined['total_slices_in_volume'].tolist() == df['total_slices_in_volume'].tolist()
+
+
+class TestValidateOCTData:
+    """Test the file existence checks in validate_oct_data()"""
+
+    def test_reload_forgets_deleted_files(self, loader, oct_dir, caplog):
+        df = loader.load_raw_data()
+        (oct_dir / 'NORMAL' / 'NORMAL_003_1.tiff').unlink()
+        loader.load_raw_data()
+
+        loader.validate_oct_data(df)
+        assert 'Missing OCT files: 1 records' in caplog.text
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])
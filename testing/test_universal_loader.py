@@ -0,0 +1,142 @@
+"""
+Test suite for the UniversalLoader harmonization engine.
+Covers column detection, row harmonization and the canonical output layout.
+"""
+
+import json
+
+import pandas as pd
+import pytest
+
+from src.loaders.universal_loader import UniversalLoader
+from src.schema import create_schema_columns
+
+
+@pytest.fixture
+def raw_df():
+    return pd.DataFrame({
+        'image_id': ['img_001', 'img_002', None],
+        'diagnosis': ['mild npdr', 'Normal', None],
+        'eye': ['right', 'left', 'os'],
+        'age': [54, 61.0, None],
+        'site': ['A', None, 'C'],
+    })
+
+
+class TestLoadAndHarmonize:
+    """Test end-to-end harmonization of a small dataset"""
+
+    def test_output_has_canonical_columns(self, raw_df):
+        out = UniversalLoader('Messidor').load_and_harmonize(raw_df)
+        assert list(out.columns) == create_schema_columns()
+        assert len(out) == 3
+
+    def test_diagnosis_and_severity(self, raw_df):
+        out = UniversalLoader('Messidor').load_and_harmonize(raw_df)
+        assert out.loc[0, 'diagnosis_category'] == 'Diabetic Retinopathy'
+        assert out.loc[0, 'severity'] == 'Mild'
+        assert out.loc[1, 'diagnosis_category'] == 'Normal'
+        assert pd.isna(out.loc[2, 'diagnosis_category'])
+
+    def test_modality_and_laterality(self, raw_df):
+        out = UniversalLoader('Messidor').load_and_harmonize(raw_df)
+        assert (out['modality'] == 'Fundus').all()
+        assert out['laterality'].tolist() == ['OD', 'OS', 'OS']
+
+    def test_low_cardinality_columns_are_categorical(self, raw_df):
+        out = UniversalLoader('Messidor').load_and_harmonize(raw_df)
+        for col in ('dataset_source', 'modality', 'laterality', 'diagnosis_category', 'severity'):
+            assert isinstance(out[col].dtype, pd.CategoricalDtype)
+
+    def test_image_id_fallback(self, raw_df):
+        out = UniversalLoader('Messidor').load_and_harmonize(raw_df)
+        assert out.loc[2, 'image_id'] == 'Messidor_2'
+
+    def test_patient_demographics(self, raw_df):
+        out = UniversalLoader('Messidor').load_and_harmonize(raw_df)
+        ages = [json.loads(p)['age'] for p in out['patient_clinical']]
+        assert ages == [54, 61, None]
+
+    def test_unmapped_columns_go_to_extra_json(self, raw_df):
+        out = UniversalLoader('Messidor').load_and_harmonize(raw_df)
+        assert json.loads(out.loc[0, 'extra_json']) == {'site': 'A'}
+        assert pd.isna(out.loc[1, 'extra_json'])
+
+    def test_extra_json_multiple_columns(self):
+        df = pd.DataFrame({'image_id': ['a', 'b'], 'site': ['A', None], 'visit': [None, 2]})
+        out = UniversalLoader('Messidor', {'image_id': 'image_id'}).load_and_harmonize(df)
+        assert json.loads(out.loc[0, 'extra_json']) == {'site': 'A'}
+        assert json.loads(out.loc[1, 'extra_json']) == {'visit': '2.0'}
+
+    def test_extra_json_unhashable_values(self):
+        # Nested cells as produced by read_json/json_normalize are stored as str()
+        df = pd.DataFrame({
+            'image_id': ['a', 'b', 'c'],
+            'meta': [{'k': 1}, {'k': 2}, None],
+            'tags': [['x', 'y'], None, ['x', 'y']],
+        })
+        out = UniversalLoader('Messidor').load_and_harmonize(df)
+        assert json.loads(out.loc[0, 'extra_json']) == {'meta': "{'k': 1}", 'tags': "['x', 'y']"}
+        assert json.loads(out.loc[1, 'extra_json']) == {'meta': "{'k': 2}"}
+        assert json.loads(out.loc[2, 'extra_json']) == {'tags': "['x', 'y']"}
+
+    def test_resolution_metadata(self):
+        df = pd.DataFrame({'image_id': ['a', 'b', 'c'], 'w': ['1024', 'n/a', None], 'h': [768.0, 'inf', None]})
+        mapping = {'image_id': 'image_id', 'resolution_x': 'w', 'resolution_y': 'h'}
+        out = UniversalLoader('Messidor', mapping).load_and_harmonize(df)
+        metadata = [json.loads(m) for m in out['image_metadata']]
+        assert (metadata[0]['resolution_x'], metadata[0]['resolution_y']) == (1024, 768)
+        assert (metadata[1]['resolution_x'], metadata[1]['resolution_y']) == (None, None)
+        assert (metadata[2]['resolution_x'], metadata[2]['resolution_y']) == (None, None)
+
+    def test_explicit_column_mapping(self):
+        df = pd.DataFrame({'scan': ['s1'], 'dx': ['wet amd']})
+        loader = UniversalLoader('OCTDL', {'image_id': 'scan', 'diagnosis': 'dx'})
+        out = loader.load_and_harmonize(df)
+        assert out.loc[0, 'image_id'] == 's1'
+        assert out.loc[0, 'diagnosis_category'] == 'Age-Related Macular Degeneration'
+        assert out.loc[0, 'severity'] == 'Severe'
+        assert loader.get_load_report()['detected_columns'] == {'image_id': 'scan', 'diagnosis': 'dx'}
+
+    def test_missing_dataset_name_fails_validation(self, raw_df):
+        loader = UniversalLoader('')
+        out = loader.load_and_harmonize(raw_df)
+        assert not out['is_valid'].any()
+        assert (out['validation_notes'] == 'Missing required fields: image_id or dataset_source').all()
+        assert loader.get_load_report()['total_warnings'] == 3
+
+    def test_empty_dataframe(self):
+        out = UniversalLoader('Empty').load_and_harmonize(pd.DataFrame())
+        assert out.empty
+        assert list(out.columns) == create_schema_columns()
+
+    def test_load_report(self, raw_df):
+        loader = UniversalLoader('Messidor')
+        loader.load_and_harmonize(raw_df)
+        report = loader.get_load_report()
+        assert report['dataset'] == 'Messidor'
+        assert report['total_errors'] == 0
+        assert report['detected_columns']['diagnosis'] == 'diagnosis'
+
+    def test_failing_column_is_recorded_and_skipped(self, raw_df):
+        class BadCell:
+            def __str__(self):
+                raise ValueError('unreadable cell')
+
+        raw_df['site'] = ['A', BadCell(), 'C']
+        raw_df['diagnosis'] = ['mild npdr', BadCell(), None]
+        loader = UniversalLoader('Messidor')
+        out = loader.load_and_harmonize(raw_df)
+        assert len(out) == 3
+        assert out['extra_json'].isna().all()
+        assert out['diagnosis_raw'].isna().all()
+        assert out['laterality'].tolist() == ['OD', 'OS', 'OS']
+
+        report = loader.get_load_report()
+        assert report['total_errors'] == len(report['errors']) >= 2
+        assert {error['column'] for error in report['errors']} == {'site', 'diagnosis'}
+        assert all(error['error'] == 'unreadable cell' for error in report['errors'])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v', '--tb=short'])